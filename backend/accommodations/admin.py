@@ -1,5 +1,12 @@
 from django.contrib import admin
-from .models import AccommodationUnit, DatePriceOverride, DatePackage
+from .models import AccommodationUnit, DatePriceOverride, DatePackage, UnitImage
+
+
+class UnitImageInline(admin.TabularInline):
+    model = UnitImage
+    fields = ('image', 'order', 'caption')
+    ordering = ('order', 'id')
+    extra = 0
 
 
 @admin.register(AccommodationUnit)
@@ -8,6 +15,7 @@ class AccommodationUnitAdmin(admin.ModelAdmin):
     list_filter = ('status',)
     search_fields = ('name', 'short_description', 'long_description')
     readonly_fields = ('created_at', 'updated_at')
+    inlines = (UnitImageInline,)
     fieldsets = (
         ('Informações Básicas', {
             'fields': ('name', 'max_capacity', 'color_hex', 'status', 'display_order')
@@ -25,30 +33,52 @@ class AccommodationUnitAdmin(admin.ModelAdmin):
             'fields': ('short_description', 'long_description', 'rules'),
             'description': 'Campos com suporte a formato Markdown'
         }),
-        ('Fotos', {
-            'fields': ('album_photos',)
+        ('Fotos (URLs externas)', {
+            'fields': ('album_photos',),
+            'classes': ('collapse',)
         }),
         ('Metadados', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        # The changelist only renders list_display, so skip the markdown and JSON columns.
+        # Other views (change form, delete) need the full row.
+        match = request.resolver_match
+        if match and match.url_name and match.url_name.endswith('_changelist'):
+            queryset = queryset.only('id', 'name', 'max_capacity', 'base_price', 'status', 'created_at')
+        return queryset
 
 
 @admin.register(DatePriceOverride)
 class DatePriceOverrideAdmin(admin.ModelAdmin):
     list_display = ['accommodation_unit', 'date', 'price', 'created_at']
-    list_filter = ['accommodation_unit', 'date']
+    list_filter = [('accommodation_unit', admin.RelatedOnlyFieldListFilter), 'date']
+    list_select_related = ['accommodation_unit']
+    autocomplete_fields = ['accommodation_unit']
     search_fields = ['accommodation_unit__name']
     date_hierarchy = 'date'
     ordering = ['-date', 'accommodation_unit']
+    
+    def get_queryset(self, request):
+        # __str__ reads accommodation_unit.name, so join it on every admin view
+        return super().get_queryset(request).select_related('accommodation_unit')
 
 
 @admin.register(DatePackage)
 class DatePackageAdmin(admin.ModelAdmin):
     list_display = ['name', 'accommodation_unit', 'start_date', 'end_date', 'color', 'created_at']
-    list_filter = ['accommodation_unit', 'name']
+    list_filter = [('accommodation_unit', admin.RelatedOnlyFieldListFilter), 'name']
+    list_select_related = ['accommodation_unit']
+    autocomplete_fields = ['accommodation_unit']
     search_fields = ['name', 'accommodation_unit__name']
     date_hierarchy = 'start_date'
     ordering = ['-created_at']
+    
+    def get_queryset(self, request):
+        # __str__ reads accommodation_unit.name, so join it on every admin view
+        return super().get_queryset(request).select_related('accommodation_unit')
 
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AccommodationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accommodations'
+    
+    def ready(self):
+        """Import signals when the app is ready."""
+        import accommodations.signals  # noqa
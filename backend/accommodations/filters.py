@@ -0,0 +1,32 @@
+"""
+FilterSets for the accommodations API.
+
+Declared once at import time; with `filterset_fields` django-filter builds a new
+FilterSet class through model introspection on every request.
+"""
+import django_filters
+from .models import AccommodationUnit, DatePriceOverride, DatePackage, UnitImage
+
+
+class AccommodationUnitFilter(django_filters.FilterSet):
+    class Meta:
+        model = AccommodationUnit
+        fields = ['status']
+
+
+class DatePriceOverrideFilter(django_filters.FilterSet):
+    class Meta:
+        model = DatePriceOverride
+        fields = ['accommodation_unit', 'date']
+
+
+class DatePackageFilter(django_filters.FilterSet):
+    class Meta:
+        model = DatePackage
+        fields = ['accommodation_unit', 'name']
+
+
+class UnitImageFilter(django_filters.FilterSet):
+    class Meta:
+        model = UnitImage
+        fields = ['accommodation_unit']
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+from accommodations.models import AccommodationUnit
+
+
+class Command(BaseCommand):
+    help = 'Marca como sujas as unidades limpas que ultrapassaram auto_dirty_days'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Repete a verificação a cada N segundos, sem encerrar (0 executa uma única vez)',
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        while True:
+            count = AccommodationUnit.mark_overdue_as_dirty()
+            self.stdout.write(self.style.SUCCESS(f'{count} unidade(s) marcada(s) como suja(s).'))
+            if interval <= 0:
+                break
+            time.sleep(interval)
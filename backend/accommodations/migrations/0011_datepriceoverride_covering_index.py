@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-16 15:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accommodations', '0010_unitimage'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='datepriceoverride',
+            name='accommodati_accommo_50cdcd_idx',
+        ),
+        migrations.AddIndex(
+            model_name='datepriceoverride',
+            index=models.Index(fields=['accommodation_unit', 'date'], include=('price',), name='dpo_unit_date_price_incl'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-16 15:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accommodations', '0011_datepriceoverride_covering_index'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='datepackage',
+            constraint=models.CheckConstraint(check=models.Q(('end_date__gte', models.F('start_date'))), name='dp_range_valid', violation_error_message='A data final deve ser posterior à data inicial.'),
+        ),
+        migrations.AddConstraint(
+            model_name='datepriceoverride',
+            constraint=models.CheckConstraint(check=models.Q(('price__gt', 0)), name='dpo_price_positive', violation_error_message='O preço deve ser maior que zero.'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-16 15:17
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+import django.db.models.functions.text
+from core.operations import AddPostgresIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accommodations', '0012_add_price_and_date_range_checks'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddPostgresIndex(
+            model_name='accommodationunit',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='unit_name_trgm'),
+        ),
+        AddPostgresIndex(
+            model_name='accommodationunit',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('short_description'), name='gin_trgm_ops'), name='unit_short_desc_trgm'),
+        ),
+        AddPostgresIndex(
+            model_name='accommodationunit',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('long_description'), name='gin_trgm_ops'), name='unit_long_desc_trgm'),
+        ),
+        AddPostgresIndex(
+            model_name='datepackage',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='package_name_trgm'),
+        ),
+    ]
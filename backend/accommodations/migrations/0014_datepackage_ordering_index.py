@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-16 15:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accommodations', '0013_add_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='datepackage',
+            options={'ordering': ['-created_at', 'start_date', 'accommodation_unit_id'], 'verbose_name': 'Pacote de Datas', 'verbose_name_plural': 'Pacotes de Datas'},
+        ),
+        migrations.AddIndex(
+            model_name='datepackage',
+            index=models.Index(fields=['-created_at', 'start_date', 'accommodation_unit'], name='dp_created_start_unit'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-16 15:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accommodations', '0014_datepackage_ordering_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='accommodationunit',
+            index=models.Index(fields=['status', 'last_cleaned_at'], name='unit_status_cleaned'),
+        ),
+        migrations.AddIndex(
+            model_name='accommodationunit',
+            index=models.Index(fields=['display_order', 'name'], name='unit_display_order_name'),
+        ),
+    ]
@@ -1,5 +1,9 @@
-from django.db import models
+from django.db import connection, models
+from django.db.models.functions import Coalesce, Upper
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+from datetime import timedelta
 import os
 
 
@@ -128,9 +132,40 @@ class AccommodationUnit(models.Model):
         verbose_name = "Unidade de Acomodação"
         verbose_name_plural = "Unidades de Acomodação"
         ordering = ['display_order', 'name']
+        indexes = [
+            # ?status= filter and the auto-dirty sweep (status=CLEAN)
+            models.Index(fields=['status', 'last_cleaned_at'], name='unit_status_cleaned'),
+            # Default ordering of the list endpoint and calendar
+            models.Index(fields=['display_order', 'name'], name='unit_display_order_name'),
+            # Trigram indexes (PostgreSQL only) backing icontains searches, which
+            # compile to UPPER(column) LIKE UPPER('%term%')
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='unit_name_trgm'),
+            GinIndex(OpClass(Upper('short_description'), name='gin_trgm_ops'), name='unit_short_desc_trgm'),
+            GinIndex(OpClass(Upper('long_description'), name='gin_trgm_ops'), name='unit_long_desc_trgm'),
+        ]
     
     def __str__(self):
         return self.name
+    
+    @classmethod
+    def mark_overdue_as_dirty(cls):
+        """
+        Mark CLEAN units as DIRTY once auto_dirty_days have passed since the last cleaning
+        (falling back to updated_at), in a single UPDATE. Returns the number of units changed.
+        """
+        now = timezone.now()
+        if connection.features.has_native_duration_field:
+            dirty_after = models.F('auto_dirty_days') * timedelta(days=1)
+        else:
+            # Backends without an interval type (SQLite) store durations as microseconds
+            dirty_after = models.F('auto_dirty_days') * models.Value(86_400_000_000)
+        dirty_after = models.ExpressionWrapper(dirty_after, output_field=models.DurationField())
+        return cls.objects.annotate(
+            cleaned_reference=Coalesce('last_cleaned_at', 'updated_at')
+        ).filter(
+            status=cls.CLEAN,
+            cleaned_reference__lte=models.Value(now) - dirty_after
+        ).update(status=cls.DIRTY, updated_at=now)
 
 
 def unit_image_upload_path(instance, filename):
@@ -220,9 +255,17 @@ class DatePriceOverride(models.Model):
         unique_together = [['accommodation_unit', 'date']]
         ordering = ['date', 'accommodation_unit']
         indexes = [
-            models.Index(fields=['accommodation_unit', 'date']),
+            # Covering index so price lookups by unit and date are index-only scans (PostgreSQL)
+            models.Index(fields=['accommodation_unit', 'date'], include=['price'], name='dpo_unit_date_price_incl'),
             models.Index(fields=['date']),
         ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(price__gt=0),
+                name='dpo_price_positive',
+                violation_error_message='O preço deve ser maior que zero.'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.accommodation_unit.name} - {self.date.strftime('%d/%m/%Y')} - R$ {self.price}"
@@ -271,10 +314,21 @@ class DatePackage(models.Model):
     class Meta:
         verbose_name = "Pacote de Datas"
         verbose_name_plural = "Pacotes de Datas"
-        ordering = ['-created_at', 'start_date', 'accommodation_unit']
+        # accommodation_unit_id (not accommodation_unit) so the default ordering
+        # doesn't join AccommodationUnit and can be read straight from dp_created_start_unit
+        ordering = ['-created_at', 'start_date', 'accommodation_unit_id']
         indexes = [
+            models.Index(fields=['-created_at', 'start_date', 'accommodation_unit'], name='dp_created_start_unit'),
             models.Index(fields=['accommodation_unit', 'start_date', 'end_date']),
             models.Index(fields=['start_date', 'end_date']),
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='package_name_trgm'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(end_date__gte=models.F('start_date')),
+                name='dp_range_valid',
+                violation_error_message='A data final deve ser posterior à data inicial.'
+            ),
         ]
     
     def __str__(self):
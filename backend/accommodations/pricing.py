@@ -0,0 +1,54 @@
+"""
+Cached lookups of custom date prices for the calendar.
+
+Cached entries are namespaced by a version key that is replaced whenever a
+DatePriceOverride changes, so invalidation never has to enumerate keys.
+"""
+import time
+from django.conf import settings
+from django.core.cache import cache
+from .models import DatePriceOverride
+
+VERSION_KEY = 'price_overrides:version'
+
+
+def _cache_version():
+    """Return the current cache namespace, creating one if it was evicted."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate_price_cache():
+    """Invalidate every cached price lookup."""
+    cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def get_override_prices(start_date, end_date, unit_ids=None):
+    """
+    Return custom prices as {(unit_id, date): price} for the given date range.
+
+    Results are cached for PRICE_CACHE_TIMEOUT seconds when it is set.
+    """
+    timeout = settings.PRICE_CACHE_TIMEOUT
+    key = None
+    if timeout:
+        units_key = ','.join(str(unit_id) for unit_id in sorted(unit_ids)) if unit_ids else 'all'
+        key = f'price_overrides:{_cache_version()}:{start_date}:{end_date}:{units_key}'
+        prices = cache.get(key)
+        if prices is not None:
+            return prices
+
+    queryset = DatePriceOverride.objects.filter(date__range=(start_date, end_date))
+    if unit_ids:
+        queryset = queryset.filter(accommodation_unit_id__in=unit_ids)
+
+    prices = {
+        (unit_id, date): price
+        for unit_id, date, price in queryset.values_list('accommodation_unit_id', 'date', 'price')
+    }
+    if key:
+        cache.set(key, prices, timeout)
+    return prices
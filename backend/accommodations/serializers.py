@@ -1,8 +1,58 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueTogetherValidator
+from django.db import models
+from django.utils.functional import cached_property
+from functools import lru_cache
+import decimal
 from .models import AccommodationUnit, DatePriceOverride, DatePackage, UnitImage
+from .pricing import invalidate_price_cache
+from core.serializers import CachedFieldsModelSerializer
 
+# Rows per INSERT when bulk creating packages
+PACKAGE_BATCH_SIZE = 1000
 
-class UnitImageSerializer(serializers.ModelSerializer):
+
+@lru_cache(maxsize=None)
+def _quantizer(decimal_places):
+    """Return the quantize exponent for the given number of decimal places."""
+    return decimal.Decimal(1).scaleb(-decimal_places)
+
+
+@lru_cache(maxsize=None)
+def _decimal_context(max_digits):
+    """Return a shared decimal context with precision set to max_digits."""
+    context = decimal.getcontext().copy()
+    if max_digits is not None:
+        context.prec = max_digits
+    return context
+
+
+class QuantizedDecimalField(serializers.DecimalField):
+    """
+    DecimalField that reuses cached quantize exponents and contexts
+    instead of rebuilding them for every value.
+    """
+    def quantize(self, value):
+        if self.decimal_places is None:
+            return value
+        return value.quantize(
+            _quantizer(self.decimal_places),
+            rounding=self.rounding,
+            context=_decimal_context(self.max_digits)
+        )
+
+
+class PriceModelSerializer(CachedFieldsModelSerializer):
+    """
+    ModelSerializer that maps model DecimalFields to QuantizedDecimalField.
+    """
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.DecimalField: QuantizedDecimalField,
+    }
+
+
+class UnitImageSerializer(CachedFieldsModelSerializer):
     """
     Serializer for UnitImage model.
     Handles image file uploads.
@@ -11,7 +61,7 @@ class UnitImageSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = UnitImage
-        fields = [
+        fields = (
             'id',
             'accommodation_unit',
             'image',
@@ -20,20 +70,29 @@ class UnitImageSerializer(serializers.ModelSerializer):
             'caption',
             'created_at',
             'updated_at',
-        ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'image_url']
+        )
+        read_only_fields = ('id', 'created_at', 'updated_at', 'image_url')
+    
+    @cached_property
+    def _base_url(self):
+        """Scheme and host of the current request, built once per serializer."""
+        request = self.context.get('request')
+        if request:
+            return request.build_absolute_uri('/').rstrip('/')
+        return ''
     
     def get_image_url(self, obj):
         """Return the full URL for the image."""
         if obj.image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.image.url)
-            return obj.image.url
+            url = obj.image.url
+            # Remote storages (e.g. Cloudinary) already return absolute URLs
+            if url.startswith('/'):
+                return f"{self._base_url}{url}"
+            return url
         return None
 
 
-class AccommodationUnitSerializer(serializers.ModelSerializer):
+class AccommodationUnitSerializer(PriceModelSerializer):
     """
     Serializador para modelo AccommodationUnit.
     Inclui todos os campos para operações de leitura e escrita.
@@ -42,7 +101,7 @@ class AccommodationUnitSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = AccommodationUnit
-        fields = [
+        fields = (
             'id',
             'name',
             'max_capacity',
@@ -64,20 +123,106 @@ class AccommodationUnitSerializer(serializers.ModelSerializer):
             'location',
             'created_at',
             'updated_at',
-        ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'images']
+        )
+        read_only_fields = ('id', 'created_at', 'updated_at', 'images')
+    
+    @classmethod
+    def images_prefetch(cls, prefix=''):
+        """Prefetch for nested images, optionally through a relation (e.g. 'accommodation_unit__')."""
+        # Explicit order_by: UnitImage's default ordering starts with the FK, which would
+        # join AccommodationUnit just to sort; (accommodation_unit, order) is indexed already
+        images = UnitImage.objects.order_by('accommodation_unit_id', 'order', 'id')
+        return models.Prefetch(f'{prefix}images', queryset=images)
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Prefetch nested images so listing units doesn't issue one query per unit."""
+        return queryset.prefetch_related(cls.images_prefetch())
+
+
+class AccommodationUnitImportSerializer(AccommodationUnitSerializer):
+    """
+    Validates rows for the bulk import. Names are matched against existing
+    units in the view, so the per-row uniqueness query is skipped.
+    """
+
+    class Meta(AccommodationUnitSerializer.Meta):
+        extra_kwargs = {'name': {'validators': []}}
 
 
-class DatePriceOverrideSerializer(serializers.ModelSerializer):
+class AccommodationUnitSummarySerializer(PriceModelSerializer):
+    """
+    Serializador resumido de AccommodationUnit para listagens.
+    Omite descrições, regras, fotos e imagens.
+    """
+    
+    class Meta:
+        model = AccommodationUnit
+        fields = (
+            'id',
+            'name',
+            'max_capacity',
+            'base_price',
+            'weekend_price',
+            'holiday_price',
+            'color_hex',
+            'status',
+            'auto_dirty_days',
+            'last_cleaned_at',
+            'default_check_in_time',
+            'default_check_out_time',
+            'display_order',
+            'updated_at',
+        )
+        read_only_fields = fields
+
+
+class BulkDatePriceOverrideListSerializer(serializers.ListSerializer):
+    """
+    Creates or updates all price overrides in a single INSERT ... ON CONFLICT statement.
+    """
+    def create(self, validated_data):
+        # A row can only be upserted once per statement; the last item for a unit/date wins
+        items = {(item['accommodation_unit'].pk, item['date']): item for item in validated_data}
+        objs = DatePriceOverride.objects.bulk_create(
+            [DatePriceOverride(**item) for item in items.values()],
+            update_conflicts=True,
+            unique_fields=['accommodation_unit', 'date'],
+            update_fields=['price', 'updated_at'],
+        )
+        # bulk_create doesn't send post_save, so invalidate cached prices here
+        invalidate_price_cache()
+        return objs
+
+
+class BulkDatePackageListSerializer(serializers.ListSerializer):
+    """
+    Creates all packages with multi-row INSERTs of up to PACKAGE_BATCH_SIZE rows.
+    """
+    def create(self, validated_data):
+        return DatePackage.objects.bulk_create(
+            [DatePackage(**item) for item in validated_data], batch_size=PACKAGE_BATCH_SIZE
+        )
+
+
+class DatePriceOverrideSerializer(PriceModelSerializer):
     """
     Serializador para modelo DatePriceOverride.
     Suporta criação em lote de substituições de preço.
     """
     accommodation_unit_name = serializers.CharField(source='accommodation_unit.name', read_only=True)
     
+    def get_validators(self):
+        """Bulk writes upsert on (accommodation_unit, date), so skip the uniqueness check there."""
+        validators = super().get_validators()
+        if isinstance(self.parent, BulkDatePriceOverrideListSerializer):
+            validators = [v for v in validators if not isinstance(v, UniqueTogetherValidator)]
+        return validators
+    
     class Meta:
         model = DatePriceOverride
-        fields = [
+        list_serializer_class = BulkDatePriceOverrideListSerializer
+        fields = (
             'id',
             'accommodation_unit',
             'accommodation_unit_name',
@@ -85,8 +230,13 @@ class DatePriceOverrideSerializer(serializers.ModelSerializer):
             'price',
             'created_at',
             'updated_at',
-        ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'accommodation_unit_name']
+        )
+        read_only_fields = ('id', 'created_at', 'updated_at', 'accommodation_unit_name')
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Join the unit read by accommodation_unit_name."""
+        return queryset.select_related('accommodation_unit')
     
     def validate_price(self, value):
         """Ensure price is positive."""
@@ -95,7 +245,7 @@ class DatePriceOverrideSerializer(serializers.ModelSerializer):
         return value
 
 
-class DatePackageSerializer(serializers.ModelSerializer):
+class DatePackageSerializer(CachedFieldsModelSerializer):
     """
     Serializador para modelo DatePackage.
     Suporta criação em lote de pacotes.
@@ -104,7 +254,8 @@ class DatePackageSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = DatePackage
-        fields = [
+        list_serializer_class = BulkDatePackageListSerializer
+        fields = (
             'id',
             'accommodation_unit',
             'accommodation_unit_name',
@@ -114,8 +265,13 @@ class DatePackageSerializer(serializers.ModelSerializer):
             'color',
             'created_at',
             'updated_at',
-        ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'accommodation_unit_name']
+        )
+        read_only_fields = ('id', 'created_at', 'updated_at', 'accommodation_unit_name')
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Join the unit read by accommodation_unit_name."""
+        return queryset.select_related('accommodation_unit')
     
     def validate(self, data):
         """Ensure end_date is after start_date."""
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import DatePriceOverride
+from .pricing import invalidate_price_cache
+
+
+@receiver(post_save, sender=DatePriceOverride)
+@receiver(post_delete, sender=DatePriceOverride)
+def invalidate_cached_prices(sender, instance, **kwargs):
+    """Drop cached price lookups whenever a custom price changes."""
+    invalidate_price_cache()
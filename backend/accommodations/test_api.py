@@ -1,51 +1,180 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
-from datetime import timedelta
+from datetime import date, timedelta
+from io import StringIO
+import csv
+import json
+from unittest import mock
+import shutil
+import tempfile
 from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework.authtoken.models import Token
-from .models import AccommodationUnit
+from .models import AccommodationUnit, DatePackage, DatePriceOverride, UnitImage
 
 
+@override_settings(AUTO_DIRTY_CHECK_INTERVAL=0)
 class AccommodationUnitAPITest(TestCase):
     """
     Test suite for AccommodationUnit API endpoints.
     """
     
-    def setUp(self):
-        """Set up test client and sample data."""
-        self.client = APIClient()
-        
-        # Create a test user and authenticate
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Create the test user and sample data once for the whole class."""
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass123'
         )
-        self.token = Token.objects.create(user=self.user)
-        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        cls.token = Token.objects.create(user=cls.user)
         
-        self.unit1 = AccommodationUnit.objects.create(
-            name="Test Chalet 1",
-            max_capacity=4,
-            base_price=250.00,
-            color_hex="#FF5733",
-            status=AccommodationUnit.CLEAN
-        )
-        self.unit2 = AccommodationUnit.objects.create(
-            name="Test Suite 2",
-            max_capacity=2,
-            base_price=150.00,
-            color_hex="#3366FF",
-            status=AccommodationUnit.DIRTY
-        )
+        cls.unit1, cls.unit2 = AccommodationUnit.objects.bulk_create([
+            AccommodationUnit(
+                name="Test Chalet 1",
+                max_capacity=4,
+                base_price=250.00,
+                color_hex="#FF5733",
+                status=AccommodationUnit.CLEAN
+            ),
+            AccommodationUnit(
+                name="Test Suite 2",
+                max_capacity=2,
+                base_price=150.00,
+                color_hex="#3366FF",
+                status=AccommodationUnit.DIRTY
+            ),
+        ])
+    
+    def setUp(self):
+        """Set up an authenticated test client."""
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        # Rendered listings are cached by data fingerprint, which repeats across tests
+        cache.clear()
     
     def test_list_accommodations(self):
         """Test listing all accommodation units."""
-        response = self.client.get('/api/accommodations/')
+        # Token lookup, dirty sweep, ETag stamp, count, page, images prefetch
+        with self.assertNumQueries(6):
+            response = self.client.get('/api/accommodations/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 2)
     
+    def test_list_summary_omits_heavy_fields(self):
+        """Test that ?summary=true lists units without descriptions, photos or images."""
+        AccommodationUnit.objects.filter(pk=self.unit1.pk).update(long_description="Descrição longa")
+        # Token lookup, dirty sweep, ETag stamp, count, page (no images prefetch)
+        with CaptureQueriesContext(connection) as context:
+            with self.assertNumQueries(5):
+                response = self.client.get('/api/accommodations/?summary=true')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.data['results'][0]
+        self.assertEqual(result['name'], 'Test Chalet 1')
+        self.assertEqual(result['status'], AccommodationUnit.CLEAN)
+        for field in ('long_description', 'short_description', 'rules', 'album_photos', 'images'):
+            self.assertNotIn(field, result)
+        self.assertNotIn('long_description', context.captured_queries[-1]['sql'])
+    
+    def test_list_etag_returns_not_modified(self):
+        """Test that an unchanged listing answers If-None-Match with 304."""
+        response = self.client.get('/api/accommodations/')
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+        
+        response = self.client.get('/api/accommodations/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        
+        response = self.client.get('/api/accommodations/?status=CLEAN', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_list_etag_changes_with_data(self):
+        """Test that unit edits, reorders, new images and deletions change the ETag."""
+        etags = {self.client.get('/api/accommodations/')['ETag']}
+        
+        self.client.patch(f'/api/accommodations/{self.unit1.id}/', {'name': 'Renamed'}, format='json')
+        etags.add(self.client.get('/api/accommodations/')['ETag'])
+        
+        self.client.post('/api/accommodations/reorder/', {'unit_ids': [self.unit2.id, self.unit1.id]}, format='json')
+        etags.add(self.client.get('/api/accommodations/')['ETag'])
+        
+        UnitImage.objects.create(accommodation_unit=self.unit1, order=0)
+        etags.add(self.client.get('/api/accommodations/')['ETag'])
+        
+        self.client.delete(f'/api/accommodations/{self.unit2.id}/')
+        etags.add(self.client.get('/api/accommodations/')['ETag'])
+        
+        self.assertEqual(len(etags), 5)
+    
+    def test_retrieve_etag_returns_not_modified(self):
+        """Test that an unchanged unit answers If-None-Match with 304 until it or its images change."""
+        url = f'/api/accommodations/{self.unit1.id}/'
+        etag = self.client.get(url)['ETag']
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        
+        image = UnitImage.objects.create(accommodation_unit=self.unit1, order=0)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['images']), 1)
+        
+        etag = response['ETag']
+        image.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+    
+    def test_list_served_from_cache_until_data_changes(self):
+        """Test that a repeated listing is served from the cache without querying units or images."""
+        first = self.client.get('/api/accommodations/')
+        # Token lookup, dirty sweep, ETag stamp
+        with self.assertNumQueries(3):
+            cached = self.client.get('/api/accommodations/')
+        self.assertEqual(cached.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached.content, first.content)
+        self.assertEqual(cached['Content-Type'], first['Content-Type'])
+        self.assertEqual(cached['ETag'], first['ETag'])
+        
+        self.client.patch(f'/api/accommodations/{self.unit1.id}/', {'name': 'Renamed'}, format='json')
+        names = [unit['name'] for unit in self.client.get('/api/accommodations/').json()['results']]
+        self.assertIn('Renamed', names)
+        
+        with override_settings(UNIT_LIST_CACHE_TIMEOUT=0):
+            with self.assertNumQueries(6):
+                self.client.get('/api/accommodations/')
+    
+    def test_list_query_count_does_not_grow_with_images(self):
+        """Test that nested images are prefetched instead of queried per unit."""
+        for unit in (self.unit1, self.unit2):
+            UnitImage.objects.create(accommodation_unit=unit, order=0)
+        
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get('/api/accommodations/')
+        
+        for idx in range(3):
+            unit = AccommodationUnit.objects.create(
+                name=f"Extra Unit {idx}",
+                max_capacity=2,
+                base_price=100.00,
+                status=AccommodationUnit.DIRTY
+            )
+            UnitImage.objects.create(accommodation_unit=unit, order=0)
+        
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/accommodations/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertEqual(len(context), len(baseline))
+        image_queries = [q['sql'] for q in context.captured_queries if 'FROM "accommodations_unitimage"' in q['sql']]
+        self.assertEqual(len(image_queries), 1)
+        self.assertNotIn('JOIN', image_queries[0])
+    
     def test_create_accommodation(self):
         """Test creating a new accommodation unit."""
         data = {
@@ -61,7 +190,9 @@ class AccommodationUnitAPITest(TestCase):
     
     def test_get_accommodation(self):
         """Test retrieving a specific accommodation unit."""
-        response = self.client.get(f'/api/accommodations/{self.unit1.id}/')
+        # Token lookup, dirty sweep, unit, images prefetch
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/accommodations/{self.unit1.id}/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['name'], 'Test Chalet 1')
     
@@ -85,7 +216,8 @@ class AccommodationUnitAPITest(TestCase):
     
     def test_filter_by_status(self):
         """Test filtering accommodations by status."""
-        response = self.client.get('/api/accommodations/?status=CLEAN')
+        with self.assertNumQueries(6):
+            response = self.client.get('/api/accommodations/?status=CLEAN')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
         self.assertEqual(response.data['results'][0]['name'], 'Test Chalet 1')
@@ -118,6 +250,19 @@ class AccommodationUnitAPITest(TestCase):
         self.unit2.refresh_from_db()
         self.assertIsNotNone(self.unit2.last_cleaned_at)
     
+    def test_status_change_to_clean_is_a_single_write(self):
+        """Test that marking a unit CLEAN saves status and last_cleaned_at in one UPDATE."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(
+                f'/api/accommodations/{self.unit2.id}/',
+                {'status': 'CLEAN'},
+                format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        updates = [q['sql'] for q in context.captured_queries if q['sql'].startswith('UPDATE "accommodations_accommodationunit"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('last_cleaned_at', updates[0])
+    
     def test_auto_dirty_after_days(self):
         """Test that a unit becomes DIRTY after auto_dirty_days."""
         # Create a clean unit with auto_dirty_days=2
@@ -164,6 +309,226 @@ class AccommodationUnitAPITest(TestCase):
         unit.refresh_from_db()
         self.assertEqual(unit.status, AccommodationUnit.CLEAN)
     
+    def test_auto_dirty_query_count_does_not_grow_with_units(self):
+        """Test that the auto-dirty check costs the same queries however many units are overdue."""
+        stale = timezone.now() - timedelta(days=10)
+        AccommodationUnit.objects.filter(pk=self.unit1.pk).update(last_cleaned_at=stale)
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get('/api/accommodations/')
+        
+        for idx in range(5):
+            AccommodationUnit.objects.create(
+                name=f"Stale Unit {idx}",
+                max_capacity=2,
+                base_price=100.00,
+                status=AccommodationUnit.CLEAN
+            )
+        AccommodationUnit.objects.update(status=AccommodationUnit.CLEAN, last_cleaned_at=stale)
+        
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/accommodations/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(context), len(baseline))
+        self.assertFalse(AccommodationUnit.objects.filter(status=AccommodationUnit.CLEAN).exists())
+    
+    @override_settings(AUTO_DIRTY_ON_READ=False)
+    def test_auto_dirty_skipped_when_disabled_on_read(self):
+        """Test that reads leave units alone when the sweep runs on a schedule instead."""
+        AccommodationUnit.objects.filter(pk=self.unit1.pk).update(last_cleaned_at=timezone.now() - timedelta(days=10))
+        response = self.client.get('/api/accommodations/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.unit1.refresh_from_db()
+        self.assertEqual(self.unit1.status, AccommodationUnit.CLEAN)
+    
+    @override_settings(AUTO_DIRTY_CHECK_INTERVAL=60)
+    def test_auto_dirty_check_throttled_on_read(self):
+        """Test that reads run the auto-dirty check at most once per interval."""
+        cache.clear()
+        self.client.get('/api/accommodations/')
+        AccommodationUnit.objects.filter(pk=self.unit1.pk).update(last_cleaned_at=timezone.now() - timedelta(days=10))
+        
+        self.client.get('/api/accommodations/')
+        self.unit1.refresh_from_db()
+        self.assertEqual(self.unit1.status, AccommodationUnit.CLEAN)
+        
+        cache.clear()
+        self.client.get('/api/accommodations/')
+        self.unit1.refresh_from_db()
+        self.assertEqual(self.unit1.status, AccommodationUnit.DIRTY)
+    
+    def test_export_csv_round_trips_through_import(self):
+        """Test that the streamed CSV export can be imported back."""
+        response = self.client.get('/api/accommodations/export_data/', {'export_format': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Streamed here; PostgreSQL writes it with COPY into a regular response
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        rows = list(csv.DictReader(StringIO(content.decode())))
+        self.assertEqual([row['name'] for row in rows], ['Test Chalet 1', 'Test Suite 2'])
+        self.assertEqual(rows[0]['base_price'], '250.00')
+        self.assertEqual(rows[0]['weekend_price'], '')
+        self.assertEqual(rows[0]['default_check_in_time'], '14:00:00')
+        
+        AccommodationUnit.objects.all().delete()
+        upload = SimpleUploadedFile('units.csv', content, content_type='text/csv')
+        response = self.client.post('/api/accommodations/import_data/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccommodationUnit.objects.count(), 2)
+    
+    def test_export_json_round_trips_through_import(self):
+        """Test that the streamed JSON export matches the API values and can be imported back."""
+        response = self.client.get('/api/accommodations/export_data/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([item['name'] for item in data], ['Test Chalet 1', 'Test Suite 2'])
+        self.assertEqual(data[0]['base_price'], '250.00')
+        self.assertIsNone(data[0]['weekend_price'])
+        self.assertEqual(data[0]['default_check_in_time'], '14:00:00')
+        
+        AccommodationUnit.objects.all().delete()
+        response = self.client.post('/api/accommodations/import_data/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccommodationUnit.objects.count(), 2)
+    
+    def test_import_writes_in_bulk(self):
+        """Test that import creates and updates units with a fixed number of queries."""
+        data = [
+            {'name': 'Test Chalet 1', 'base_price': '300.00'},
+            {'name': 'New Cabin', 'max_capacity': 3, 'base_price': '180.00'},
+            {'name': 'New Cabin', 'max_capacity': 5},
+            {'name': 'Broken', 'max_capacity': 'many', 'base_price': '100.00'},
+            {'name': 'Other Cabin', 'max_capacity': 2, 'base_price': '120.00'},
+        ]
+        # Token, import savepoint, name lookup, batch savepoint, insert, update, release x2
+        with self.assertNumQueries(8):
+            response = self.client.post('/api/accommodations/import_data/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imported'], 4)
+        self.assertEqual([error['index'] for error in response.data['errors']], [3])
+        
+        self.unit1.refresh_from_db()
+        self.assertEqual(str(self.unit1.base_price), '300.00')
+        self.assertEqual(self.unit1.max_capacity, 4)
+        self.assertEqual(AccommodationUnit.objects.get(name='New Cabin').max_capacity, 5)
+        self.assertTrue(AccommodationUnit.objects.filter(name='Other Cabin').exists())
+        self.assertFalse(AccommodationUnit.objects.filter(name='Broken').exists())
+    
+    def test_import_csv_in_batches(self):
+        """Test that a CSV upload is imported batch by batch, updating units from earlier batches."""
+        content = (
+            'name,max_capacity,base_price\r\n'
+            'Cabin A,2,100.00\r\n'
+            'Cabin B,3,110.00\r\n'
+            'Cabin C,4,120.00\r\n'
+            'Cabin A,6,130.00\r\n'
+            'Test Chalet 1,8,250.00\r\n'
+        ).encode()
+        upload = SimpleUploadedFile('units.csv', content, content_type='text/csv')
+        with mock.patch('accommodations.views.IMPORT_BATCH_SIZE', 2):
+            response = self.client.post('/api/accommodations/import_data/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imported'], 5)
+        self.assertEqual(AccommodationUnit.objects.get(name='Cabin A').max_capacity, 6)
+        self.assertEqual(AccommodationUnit.objects.get(name='Test Chalet 1').max_capacity, 8)
+        self.assertEqual(AccommodationUnit.objects.count(), 5)
+    
+    def test_import_json_upload(self):
+        """Test that a JSON upload is imported, and a malformed one saves nothing."""
+        content = json.dumps([
+            {'name': 'Cabin A', 'max_capacity': 2, 'base_price': '100.00'},
+            {'name': 'Cabin B', 'max_capacity': 3, 'base_price': '110.00'},
+        ]).encode()
+        upload = SimpleUploadedFile('units.json', content, content_type='application/json')
+        response = self.client.post('/api/accommodations/import_data/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imported'], 2)
+        
+        # The first element is valid but the array is cut off
+        upload = SimpleUploadedFile('units.json', b'[{"name": "Cabin C", "max_capacity": 2, "base_price": "1.00"}, {"name"',
+                                    content_type='application/json')
+        response = self.client.post('/api/accommodations/import_data/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'Invalid JSON file')
+        self.assertFalse(AccommodationUnit.objects.filter(name='Cabin C').exists())
+        
+        upload = SimpleUploadedFile('units.json', b'{"name": "Cabin D"}', content_type='application/json')
+        response = self.client.post('/api/accommodations/import_data/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_import_rejects_empty_data_and_non_object_rows(self):
+        """Test that an empty import is a 400 and rows that aren't objects are reported per index."""
+        response = self.client.post('/api/accommodations/import_data/', [], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'No accommodation units to import')
+        
+        data = ['Cabin A', {'name': ' Cabin B ', 'max_capacity': 2, 'base_price': '100.00'}, {'name': ['x']}]
+        response = self.client.post('/api/accommodations/import_data/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imported'], 1)
+        self.assertEqual([error['index'] for error in response.data['errors']], [0, 2])
+        
+        # A name with surrounding spaces matches the (trimmed) unit already stored
+        data = [{'name': 'Cabin B  ', 'max_capacity': 5}]
+        response = self.client.post('/api/accommodations/import_data/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccommodationUnit.objects.get(name='Cabin B').max_capacity, 5)
+    
+    def test_import_numeric_name_updates_existing_unit(self):
+        """Test that a numeric name matches the unit stored with that name instead of creating a duplicate."""
+        unit = AccommodationUnit.objects.create(name='7', max_capacity=2, base_price=100.00)
+        data = [{'name': 7, 'max_capacity': 5, 'base_price': '120.00'}]
+        response = self.client.post('/api/accommodations/import_data/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imported'], 1)
+        unit.refresh_from_db()
+        self.assertEqual((unit.max_capacity, str(unit.base_price)), (5, '120.00'))
+        self.assertEqual(AccommodationUnit.objects.filter(name='7').count(), 1)
+    
+    def test_import_reports_batch_rejected_by_database(self):
+        """Test that a batch failing a database constraint is reported on its rows, not as a 500."""
+        bulk_create = AccommodationUnit.objects.bulk_create
+        
+        def reject_first_batch(objs, *args, **kwargs):
+            # e.g. a unit with the same name created by another request meanwhile
+            if reject_first_batch.calls == 0:
+                reject_first_batch.calls += 1
+                raise IntegrityError('UNIQUE constraint failed: accommodations_accommodationunit.name')
+            return bulk_create(objs, *args, **kwargs)
+        reject_first_batch.calls = 0
+        
+        data = [
+            {'name': 'Cabin A', 'max_capacity': 2, 'base_price': '100.00'},
+            {'name': 'Cabin B', 'max_capacity': 'many'},
+            {'name': 'Cabin C', 'max_capacity': 3, 'base_price': '110.00'},
+        ]
+        with mock.patch('accommodations.views.IMPORT_BATCH_SIZE', 2), \
+                mock.patch.object(AccommodationUnit.objects, 'bulk_create', side_effect=reject_first_batch):
+            response = self.client.post('/api/accommodations/import_data/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imported'], 1)
+        self.assertEqual(sorted(error['index'] for error in response.data['errors']), [0, 1])
+        self.assertFalse(AccommodationUnit.objects.filter(name='Cabin A').exists())
+        self.assertTrue(AccommodationUnit.objects.filter(name='Cabin C').exists())
+    
+    def test_mark_dirty_units_command(self):
+        """Test that the mark_dirty_units command marks overdue units as DIRTY."""
+        AccommodationUnit.objects.filter(pk=self.unit1.pk).update(last_cleaned_at=timezone.now() - timedelta(days=10))
+        out = StringIO()
+        call_command('mark_dirty_units', stdout=out)
+        self.unit1.refresh_from_db()
+        self.assertEqual(self.unit1.status, AccommodationUnit.DIRTY)
+        self.assertIn('1 unidade(s)', out.getvalue())
+    
+    def test_mark_dirty_units_command_interval(self):
+        """Test that --interval keeps sweeping, sleeping between runs."""
+        out = StringIO()
+        with mock.patch('accommodations.management.commands.mark_dirty_units.time.sleep',
+                        side_effect=[None, KeyboardInterrupt]) as sleep:
+            with self.assertRaises(KeyboardInterrupt):
+                call_command('mark_dirty_units', interval=300, stdout=out)
+        sleep.assert_called_with(300)
+        self.assertEqual(out.getvalue().count('unidade(s) marcada(s)'), 2)
+    
     def test_create_with_auto_dirty_days(self):
         """Test creating an accommodation with custom auto_dirty_days."""
         data = {
@@ -197,11 +562,13 @@ class AccommodationUnitAPITest(TestCase):
         
         # Reorder: unit3, unit1, unit2
         new_order = [unit3.id, self.unit1.id, self.unit2.id]
-        response = self.client.post(
-            '/api/accommodations/reorder/',
-            {'unit_ids': new_order},
-            format='json'
-        )
+        # Token lookup and a single UPDATE
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                '/api/accommodations/reorder/',
+                {'unit_ids': new_order},
+                format='json'
+            )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['updated'], 3)
         
@@ -289,19 +656,16 @@ class UnitImageAPITest(TestCase):
     Test suite for UnitImage API endpoints.
     """
     
-    def setUp(self):
-        """Set up test client and sample data."""
-        self.client = APIClient()
-        
-        # Create a test user and authenticate
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Create the test user and sample data once for the whole class."""
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass123'
         )
-        self.token = Token.objects.create(user=self.user)
-        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        cls.token = Token.objects.create(user=cls.user)
         
-        self.unit = AccommodationUnit.objects.create(
+        cls.unit = AccommodationUnit.objects.create(
             name="Test Chalet",
             max_capacity=4,
             base_price=250.00,
@@ -309,6 +673,11 @@ class UnitImageAPITest(TestCase):
             status=AccommodationUnit.CLEAN
         )
     
+    def setUp(self):
+        """Set up an authenticated test client."""
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+    
     def test_list_images_for_unit(self):
         """Test listing images for a specific accommodation unit."""
         from .models import UnitImage
@@ -346,6 +715,51 @@ class UnitImageAPITest(TestCase):
         # Verify image was deleted
         self.assertFalse(UnitImage.objects.filter(id=image.id).exists())
     
+    def test_image_url_is_absolute(self):
+        """Test that image_url is built from the request host and the media URL."""
+        from .models import UnitImage
+        
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        with override_settings(MEDIA_ROOT=media_root):
+            image = UnitImage.objects.create(
+                accommodation_unit=self.unit,
+                image=SimpleUploadedFile('photo.jpg', b'fake image content', content_type='image/jpeg'),
+                order=0
+            )
+            response = self.client.get(f'/api/unit-images/{image.id}/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['image_url'], f'http://testserver{image.image.url}')
+    
+    def test_bulk_upload_images(self):
+        """Test that bulk upload stores every file and inserts the records in order after existing images."""
+        from .models import UnitImage
+        
+        UnitImage.objects.create(accommodation_unit=self.unit, order=4)
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        with override_settings(MEDIA_ROOT=media_root):
+            images = [
+                SimpleUploadedFile(f'photo{idx}.jpg', f'image {idx}'.encode(), content_type='image/jpeg')
+                for idx in range(3)
+            ]
+            response = self.client.post('/api/unit-images/bulk_upload/', {
+                'accommodation_unit': self.unit.id,
+                'images': images,
+                'captions': 'Sala, Quarto',
+            }, format='multipart')
+            
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(response.data['created'], 3)
+            created = UnitImage.objects.exclude(order=4).order_by('order')
+            self.assertEqual([(image.order, image.caption) for image in created],
+                             [(5, 'Sala'), (6, 'Quarto'), (7, '')])
+            for idx, image in enumerate(created):
+                self.assertTrue(image.image.name.startswith(f'unit_images/{self.unit.id}/'))
+                with image.image.open('rb') as stored:
+                    self.assertEqual(stored.read(), f'image {idx}'.encode())
+    
     def test_reorder_images(self):
         """Test reordering images."""
         from .models import UnitImage
@@ -363,10 +777,11 @@ class UnitImageAPITest(TestCase):
             order=2
         )
         
-        # Reorder: swap image1 and image3
-        response = self.client.post('/api/unit-images/reorder/', {
-            'image_ids': [image3.id, image2.id, image1.id]
-        }, format='json')
+        # Reorder: swap image1 and image3 (token lookup and a single UPDATE)
+        with self.assertNumQueries(2):
+            response = self.client.post('/api/unit-images/reorder/', {
+                'image_ids': [image3.id, image2.id, image1.id]
+            }, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['updated'], 3)
@@ -379,5 +794,221 @@ class UnitImageAPITest(TestCase):
         self.assertEqual(image3.order, 0)
         self.assertEqual(image2.order, 1)
         self.assertEqual(image1.order, 2)
+    
+    def test_reorder_images_reports_skipped_ids(self):
+        """Test that unknown image ids are skipped and reported."""
+        image = UnitImage.objects.create(accommodation_unit=self.unit, order=5)
+        response = self.client.post('/api/unit-images/reorder/', {
+            'image_ids': [999999, str(image.id)]
+        }, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(response.data['skipped_ids'], [999999])
+        image.refresh_from_db()
+        self.assertEqual(image.order, 1)
+
+
 
 
+class DatePriceOverrideAPITest(TestCase):
+    """
+    Test suite for DatePriceOverride API endpoints.
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Create the test user and sample data once for the whole class."""
+        cls.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        
+        cls.unit1, cls.unit2 = AccommodationUnit.objects.bulk_create([
+            AccommodationUnit(
+                name="Test Chalet 1",
+                max_capacity=4,
+                base_price=250.00
+            ),
+            AccommodationUnit(
+                name="Test Suite 2",
+                max_capacity=2,
+                base_price=150.00
+            ),
+        ])
+        DatePriceOverride.objects.bulk_create([
+            DatePriceOverride(
+                accommodation_unit=cls.unit1,
+                date=date(2025, 12, 25),
+                price=500.00
+            ),
+            DatePriceOverride(
+                accommodation_unit=cls.unit2,
+                date=date(2025, 12, 31),
+                price=450.00
+            ),
+        ])
+    
+    def setUp(self):
+        """Set up an authenticated test client."""
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        cache.clear()
+    
+    def test_price_map(self):
+        """Test that price_map returns prices keyed by unit and date."""
+        response = self.client.get(
+            '/api/date-price-overrides/price_map/?start_date=2025-12-01&end_date=2025-12-31'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            f'{self.unit1.id}-2025-12-25': '500.00',
+            f'{self.unit2.id}-2025-12-31': '450.00',
+        })
+    
+    def test_price_map_filters_by_units_and_range(self):
+        """Test that price_map honors unit_ids and the date range."""
+        response = self.client.get(
+            f'/api/date-price-overrides/price_map/?start_date=2025-12-26&end_date=2026-01-31&unit_ids={self.unit1.id},{self.unit2.id}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data), [f'{self.unit2.id}-2025-12-31'])
+        
+        response = self.client.get(
+            f'/api/date-price-overrides/price_map/?start_date=2025-12-01&end_date=2025-12-31&unit_ids={self.unit1.id}'
+        )
+        self.assertEqual(list(response.data), [f'{self.unit1.id}-2025-12-25'])
+    
+    def test_price_map_requires_valid_dates(self):
+        """Test that price_map rejects missing or malformed dates."""
+        response = self.client.get('/api/date-price-overrides/price_map/?start_date=2025-12-01')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(
+            '/api/date-price-overrides/price_map/?start_date=2025-12-01&end_date=not-a-date'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    @override_settings(PRICE_CACHE_TIMEOUT=300)
+    def test_price_map_cache_invalidated_on_change(self):
+        """Test that cached prices are served until an override changes."""
+        url = '/api/date-price-overrides/price_map/?start_date=2025-12-01&end_date=2025-12-31'
+        self.client.get(url)
+        
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url)
+        self.assertFalse(any('datepriceoverride' in q['sql'] for q in context.captured_queries))
+        
+        DatePriceOverride.objects.filter(accommodation_unit=self.unit1).get().delete()
+        response = self.client.get(url)
+        self.assertEqual(list(response.data), [f'{self.unit2.id}-2025-12-31'])
+    
+    def test_bulk_create_upserts_existing_prices(self):
+        """Test that bulk_create updates existing unit/date pairs and creates new ones."""
+        response = self.client.post('/api/date-price-overrides/bulk_create/', {
+            'unit_ids': [self.unit1.id, self.unit2.id],
+            'dates': ['2025-12-25', '2025-12-26'],
+            'price': 600.00
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(DatePriceOverride.objects.count(), 5)
+        override = DatePriceOverride.objects.get(accommodation_unit=self.unit1, date=date(2025, 12, 25))
+        self.assertEqual(override.price, 600)
+    
+    def test_bulk_create_items_last_duplicate_wins(self):
+        """Test that repeated unit/date items in one request keep the last price."""
+        response = self.client.post('/api/date-price-overrides/bulk_create/', {
+            'items': [
+                {'accommodation_unit': self.unit1.id, 'date': '2025-12-25', 'price': 700.00},
+                {'accommodation_unit': self.unit1.id, 'date': '2025-12-25', 'price': 800.00},
+            ]
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 1)
+        override = DatePriceOverride.objects.get(accommodation_unit=self.unit1, date=date(2025, 12, 25))
+        self.assertEqual(override.price, 800)
+    
+    def test_create_duplicate_override_rejected(self):
+        """Test that single creates still validate the unit/date uniqueness."""
+        response = self.client.post('/api/date-price-overrides/', {
+            'accommodation_unit': self.unit1.id,
+            'date': '2025-12-25',
+            'price': 700.00
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DatePackageAPITest(TestCase):
+    """
+    Test suite for DatePackage API endpoints.
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Create the test user and sample data once for the whole class."""
+        cls.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        
+        cls.unit1, cls.unit2 = AccommodationUnit.objects.bulk_create([
+            AccommodationUnit(
+                name="Test Chalet 1",
+                max_capacity=4,
+                base_price=250.00
+            ),
+            AccommodationUnit(
+                name="Test Suite 2",
+                max_capacity=2,
+                base_price=150.00
+            ),
+        ])
+    
+    def setUp(self):
+        """Set up an authenticated test client."""
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+    
+    def test_bulk_create_packages(self):
+        """Test creating the same package for several units."""
+        response = self.client.post('/api/date-packages/bulk_create/?return=full', {
+            'unit_ids': [self.unit1.id, self.unit2.id],
+            'name': 'Natal 2025',
+            'start_date': '2025-12-20',
+            'end_date': '2025-12-26',
+            'color': '#FF5733'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(DatePackage.objects.count(), 2)
+        self.assertEqual(
+            sorted(p['accommodation_unit_name'] for p in response.data['packages']),
+            ['Test Chalet 1', 'Test Suite 2']
+        )
+    
+    def test_bulk_create_packages_returns_count_by_default(self):
+        """Test that bulk create returns the new ids, and only serializes the packages when asked for."""
+        response = self.client.post('/api/date-packages/bulk_create/', {
+            'unit_ids': [self.unit1.id, self.unit2.id],
+            'name': 'Natal 2025',
+            'start_date': '2025-12-20',
+            'end_date': '2025-12-26',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(sorted(response.data['ids']), sorted(DatePackage.objects.values_list('pk', flat=True)))
+        self.assertNotIn('packages', response.data)
+    
+    def test_bulk_create_rejects_inverted_range(self):
+        """Test that packages ending before they start are rejected."""
+        response = self.client.post('/api/date-packages/bulk_create/', {
+            'unit_ids': [self.unit1.id],
+            'name': 'Invalido',
+            'start_date': '2025-12-26',
+            'end_date': '2025-12-20'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(DatePackage.objects.count(), 0)
@@ -1,5 +1,13 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection, transaction
 from django.test import TestCase
-from .models import AccommodationUnit
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import serializers
+from .models import AccommodationUnit, DatePriceOverride, DatePackage
+from .serializers import AccommodationUnitSerializer, QuantizedDecimalField
 
 
 class AccommodationUnitModelTest(TestCase):
@@ -30,18 +38,17 @@ class AccommodationUnitModelTest(TestCase):
         
     def test_status_choices(self):
         """Test all status choices."""
-        unit = AccommodationUnit.objects.create(
-            name="Room 201",
-            max_capacity=2,
-            base_price=100.00
-        )
+        # One unit per status, written and read back in a single query each
+        AccommodationUnit.objects.bulk_create([
+            AccommodationUnit(name=f"Room {status}", max_capacity=2, base_price=100.00, status=status)
+            for status, _ in AccommodationUnit.STATUS_CHOICES
+        ])
+        stored = dict(AccommodationUnit.objects.values_list('name', 'status'))
         
         # Test each status
         for status, _ in AccommodationUnit.STATUS_CHOICES:
-            unit.status = status
-            unit.save()
-            unit.refresh_from_db()
-            self.assertEqual(unit.status, status)
+            with self.subTest(status=status):
+                self.assertEqual(stored[f"Room {status}"], status)
     
     def test_new_description_fields(self):
         """Test new description and rules fields."""
@@ -86,4 +93,212 @@ class AccommodationUnitModelTest(TestCase):
         self.assertEqual(unit.long_description, '')
         self.assertEqual(unit.rules, '')
         self.assertEqual(unit.album_photos, [])
+    
+    def test_mark_overdue_as_dirty(self):
+        """Test that overdue CLEAN units are marked DIRTY in a single query."""
+        now = timezone.now()
+        overdue = AccommodationUnit.objects.create(name="Overdue", max_capacity=2, base_price=100.00, auto_dirty_days=2)
+        boundary = AccommodationUnit.objects.create(name="Boundary", max_capacity=2, base_price=100.00, auto_dirty_days=3)
+        recent = AccommodationUnit.objects.create(name="Recent", max_capacity=2, base_price=100.00, auto_dirty_days=3)
+        never_cleaned = AccommodationUnit.objects.create(name="Never Cleaned", max_capacity=2, base_price=100.00, auto_dirty_days=1)
+        AccommodationUnit.objects.filter(pk=overdue.pk).update(last_cleaned_at=now - timedelta(days=2, hours=1))
+        AccommodationUnit.objects.filter(pk=boundary.pk).update(last_cleaned_at=now - timedelta(days=3, minutes=1))
+        AccommodationUnit.objects.filter(pk=recent.pk).update(last_cleaned_at=now - timedelta(days=2, hours=23))
+        AccommodationUnit.objects.filter(pk=never_cleaned.pk).update(updated_at=now - timedelta(days=2))
+        
+        with self.assertNumQueries(1):
+            changed = AccommodationUnit.mark_overdue_as_dirty()
+        
+        self.assertEqual(changed, 3)
+        statuses = dict(AccommodationUnit.objects.values_list('name', 'status'))
+        self.assertEqual(statuses['Overdue'], AccommodationUnit.DIRTY)
+        self.assertEqual(statuses['Boundary'], AccommodationUnit.DIRTY)
+        self.assertEqual(statuses['Never Cleaned'], AccommodationUnit.DIRTY)
+        self.assertEqual(statuses['Recent'], AccommodationUnit.CLEAN)
+
+
+class DateConstraintTest(TestCase):
+    """Test suite for database constraints on price overrides and packages."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.unit = AccommodationUnit.objects.create(
+            name="Chalet Constraints",
+            max_capacity=4,
+            base_price=200.00
+        )
+    
+    def test_price_override_must_be_positive(self):
+        """Test that the database rejects non-positive override prices."""
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            DatePriceOverride.objects.create(
+                accommodation_unit=self.unit,
+                date=date(2025, 12, 25),
+                price=0
+            )
+    
+    def test_package_end_date_not_before_start(self):
+        """Test that the database rejects packages ending before they start."""
+        DatePackage.objects.create(
+            accommodation_unit=self.unit,
+            name="Um dia",
+            start_date=date(2025, 12, 20),
+            end_date=date(2025, 12, 20)
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            DatePackage.objects.create(
+                accommodation_unit=self.unit,
+                name="Invertido",
+                start_date=date(2025, 12, 26),
+                end_date=date(2025, 12, 20)
+            )
+
+
+class DatePackageOrderingTest(TestCase):
+    """Test suite for DatePackage default ordering."""
+    
+    def test_default_ordering_does_not_join_units(self):
+        """Test that default ordering uses DatePackage columns only, matching dp_created_start_unit."""
+        sql = str(DatePackage.objects.all().query)
+        self.assertNotIn('JOIN', sql)
+        self.assertIn('ORDER BY', sql)
+
+
+class AdminQuerysetTest(TestCase):
+    """Test suite for admin changelist querysets."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(
+            username='admin',
+            password='adminpass123',
+            email='admin@example.com'
+        )
+        cls.unit = AccommodationUnit.objects.create(
+            name="Chalet Admin",
+            max_capacity=4,
+            base_price=200.00
+        )
+        DatePriceOverride.objects.create(
+            accommodation_unit=cls.unit,
+            date=date(2025, 12, 25),
+            price=500.00
+        )
+        DatePackage.objects.create(
+            accommodation_unit=cls.unit,
+            name="Natal 2025",
+            start_date=date(2025, 12, 20),
+            end_date=date(2025, 12, 26)
+        )
+    
+    def setUp(self):
+        self.client.force_login(self.user)
+    
+    def assert_range_filtered(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 1)
+        for query in context.captured_queries:
+            self.assertNotIn('extract', query['sql'].lower())
+    
+    def test_price_override_hierarchy_uses_date_range(self):
+        """Test that drilling into a month filters DatePriceOverride by a date range."""
+        self.assert_range_filtered(
+            '/admin/accommodations/datepriceoverride/?date__year=2025&date__month=12'
+        )
+    
+    def test_package_hierarchy_uses_date_range(self):
+        """Test that drilling into a day filters DatePackage by a date range."""
+        self.assert_range_filtered(
+            '/admin/accommodations/datepackage/?start_date__year=2025&start_date__month=12&start_date__day=20'
+        )
+    
+    def test_unit_changelist_defers_large_fields(self):
+        """Test that the unit changelist doesn't select description or photo columns."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/admin/accommodations/accommodationunit/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Chalet Admin")
+        list_queries = [
+            q['sql'] for q in context.captured_queries
+            if 'FROM "accommodations_accommodationunit"' in q['sql'] and 'COUNT(' not in q['sql']
+        ]
+        self.assertTrue(list_queries)
+        for sql in list_queries:
+            self.assertNotIn('long_description', sql)
+            self.assertNotIn('album_photos', sql)
+    
+    def test_unit_change_form_loads_full_row(self):
+        """Test that the change form still renders deferred fields."""
+        self.unit.long_description = "Descrição longa"
+        self.unit.save()
+        response = self.client.get(f'/admin/accommodations/accommodationunit/{self.unit.pk}/change/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Descrição longa")
+    
+    def test_unit_filter_only_lists_units_in_use(self):
+        """Test that the changelist unit filter skips units with no rows."""
+        AccommodationUnit.objects.create(name="Sem Registros", max_capacity=2, base_price=100.00)
+        for url in ('/admin/accommodations/datepriceoverride/', '/admin/accommodations/datepackage/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, "Chalet Admin")
+            self.assertNotContains(response, "Sem Registros")
+    
+    def test_change_forms_do_not_load_every_unit(self):
+        """Test that the unit FK widget is an autocomplete instead of a full dropdown."""
+        for idx in range(5):
+            AccommodationUnit.objects.create(name=f"Extra {idx}", max_capacity=2, base_price=100.00)
+        for url in (
+            '/admin/accommodations/datepriceoverride/add/',
+            '/admin/accommodations/datepackage/add/',
+        ):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotContains(response, "Extra 0")
+            unit_queries = [
+                q['sql'] for q in context.captured_queries
+                if 'FROM "accommodations_accommodationunit"' in q['sql']
+            ]
+            self.assertEqual(unit_queries, [])
+
 
+class QuantizedDecimalFieldTest(TestCase):
+    """Test suite for QuantizedDecimalField."""
+    
+    def test_matches_drf_decimal_field_output(self):
+        """Test that cached quantizing renders the same strings as DRF's DecimalField."""
+        values = ['0', '1.005', '250', '99999999.994', '-12.345', '1234567.891']
+        for max_digits, decimal_places in [(10, 2), (None, 3), (12, 0)]:
+            expected_field = serializers.DecimalField(max_digits=max_digits, decimal_places=decimal_places)
+            field = QuantizedDecimalField(max_digits=max_digits, decimal_places=decimal_places)
+            for value in values:
+                self.assertEqual(
+                    field.to_representation(Decimal(value)),
+                    expected_field.to_representation(Decimal(value))
+                )
+
+
+class CachedFieldsSerializerTest(TestCase):
+    """Test suite for the per-class serializer field cache."""
+    
+    def test_fields_are_built_once_and_copied_per_instance(self):
+        """Test that instances share the field layout but not field objects."""
+        first = AccommodationUnitSerializer()
+        second = AccommodationUnitSerializer()
+        self.assertEqual(list(first.fields), list(second.fields))
+        self.assertIn('_cached_fields', AccommodationUnitSerializer.__dict__)
+        for name in first.fields:
+            self.assertIsNot(first.fields[name], second.fields[name])
+            self.assertIs(first.fields[name].parent, first)
+            self.assertIs(second.fields[name].parent, second)
+    
+    def test_output_matches_uncached_serializer(self):
+        """Test that cached fields serialize exactly like a freshly introspected serializer."""
+        unit = AccommodationUnit.objects.create(name='Chalé 1', max_capacity=4, base_price=Decimal('150.00'))
+        uncached = type('UncachedUnitSerializer', (AccommodationUnitSerializer,), {
+            'get_fields': serializers.ModelSerializer.get_fields,
+        })
+        self.assertEqual(AccommodationUnitSerializer(unit).data, uncached(unit).data)
@@ -4,18 +4,50 @@ from rest_framework.response import Response
 from rest_framework.filters import OrderingFilter
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django_filters.rest_framework import DjangoFilterBackend
-from django.utils import timezone
+from django.conf import settings
+from django.core.cache import cache
 from django.http import HttpResponse
-from django.db import models
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.utils.dateparse import parse_date
+from django.db import IntegrityError, models, transaction
 from datetime import timedelta, datetime
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import json
-import csv
-from io import StringIO
+from collections.abc import Iterator
 from .models import AccommodationUnit, DatePriceOverride, DatePackage, UnitImage
-from .serializers import AccommodationUnitSerializer, DatePriceOverrideSerializer, DatePackageSerializer, UnitImageSerializer
+from .serializers import AccommodationUnitSerializer, AccommodationUnitImportSerializer, AccommodationUnitSummarySerializer, DatePriceOverrideSerializer, DatePackageSerializer, UnitImageSerializer
+from .filters import AccommodationUnitFilter, DatePriceOverrideFilter, DatePackageFilter, UnitImageFilter
+from .pricing import get_override_prices
+from core.exports import EXPORT_CHUNK_SIZE, copy_csv, stream_json
+from core.imports import IMPORT_BATCH_SIZE, batched, in_bulk_by, lookup_key, read_csv_upload, read_json_upload
+from core.mixins import EagerLoadingMixin
+
+DIRTY_CHECK_CACHE_KEY = 'accommodations:dirty_check'
+
+# Rendered unit listings are cached under this prefix plus the listing ETag
+UNIT_LIST_CACHE_PREFIX = 'accommodations:list:'
+
+# Image files written to storage at the same time by bulk_upload
+IMAGE_UPLOAD_WORKERS = 4
+
+UNIT_EXPORT_FIELDS = (
+    'name', 'max_capacity', 'base_price', 'weekend_price', 'holiday_price',
+    'color_hex', 'status', 'auto_dirty_days', 'default_check_in_time', 'default_check_out_time'
+)
+
+
+def _position_case(positions):
+    """CASE expression mapping each primary key in positions to its index."""
+    return models.Case(
+        *[models.When(pk=pk, then=models.Value(index)) for pk, index in positions.items()],
+        output_field=models.IntegerField(),
+    )
 
 
-class AccommodationUnitViewSet(viewsets.ModelViewSet):
+class AccommodationUnitViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing AccommodationUnit resources.
     
@@ -24,89 +56,127 @@ class AccommodationUnitViewSet(viewsets.ModelViewSet):
     queryset = AccommodationUnit.objects.all()
     serializer_class = AccommodationUnitSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
-    filterset_fields = ['status']
+    filterset_class = AccommodationUnitFilter
     ordering_fields = ['name', 'created_at', 'base_price', 'display_order']
     ordering = ['display_order', 'name']
     
+    def _is_summary(self):
+        """Whether the client asked for the slim listing (?summary=true)."""
+        return self.action == 'list' and self.request.query_params.get('summary') == 'true'
+    
+    def get_serializer_class(self):
+        if self._is_summary():
+            return AccommodationUnitSummarySerializer
+        return super().get_serializer_class()
+    
+    def get_queryset(self):
+        """Load only the columns the summary listing renders."""
+        queryset = super().get_queryset()
+        if self._is_summary():
+            # Skip the markdown and photo columns the summary doesn't render
+            queryset = queryset.only(*AccommodationUnitSummarySerializer.Meta.fields)
+        return queryset
+    
     def list(self, request, *args, **kwargs):
         """
         List accommodations and automatically update dirty status based on auto_dirty_days.
         """
         # Check and update dirty status before listing
         self._check_and_update_dirty_status()
-        return super().list(request, *args, **kwargs)
+        
+        # Answer 304 Not Modified when the client already has this exact listing
+        etag = self._list_etag(request)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = self._cached_list(request, etag, *args, **kwargs)
+        response['ETag'] = etag
+        # Let browsers keep the listing but revalidate it on every request
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
     
-    def retrieve(self, request, *args, **kwargs):
+    def _check_and_update_dirty_status(self):
         """
-        Retrieve an accommodation and check dirty status.
+        Mark overdue CLEAN units as DIRTY, at most once per AUTO_DIRTY_CHECK_INTERVAL seconds.
         """
-        # Check and update dirty status before retrieving
-        self._check_and_update_dirty_status()
-        return super().retrieve(request, *args, **kwargs)
+        if not settings.AUTO_DIRTY_ON_READ:
+            return
+        # cache.add only succeeds for the first request after the key expires
+        interval = settings.AUTO_DIRTY_CHECK_INTERVAL
+        if interval and not cache.add(DIRTY_CHECK_CACHE_KEY, True, timeout=interval):
+            return
+        AccommodationUnit.mark_overdue_as_dirty()
     
-    def _check_and_update_dirty_status(self):
+    def _cached_list(self, request, etag, *args, **kwargs):
         """
-        Check all CLEAN units and update to DIRTY if they exceed auto_dirty_days.
+        Return the rendered listing from the cache, or render it and cache it
+        for UNIT_LIST_CACHE_TIMEOUT seconds. The key is the ETag, which changes
+        with the data, so entries never need invalidating. The host is part of
+        the key because image URLs are absolute.
         """
-        now = timezone.now()
-        clean_units = AccommodationUnit.objects.filter(status=AccommodationUnit.CLEAN)
-        
-        for unit in clean_units:
-            # If last_cleaned_at is not set, use updated_at as a fallback
-            reference_time = unit.last_cleaned_at or unit.updated_at
-            
-            if reference_time:
-                days_since_cleaned = (now - reference_time).days
-                if days_since_cleaned >= unit.auto_dirty_days:
-                    unit.status = AccommodationUnit.DIRTY
-                    unit.save(update_fields=['status', 'updated_at'])
+        timeout = settings.UNIT_LIST_CACHE_TIMEOUT
+        if not timeout:
+            return super().list(request, *args, **kwargs)
+        
+        key = f'{UNIT_LIST_CACHE_PREFIX}{etag}:{request.get_host()}'
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+        
+        def store(rendered):
+            # Only JSON; the browsable API page is rendered per user
+            if rendered.status_code == 200 and rendered.accepted_renderer.format == 'json':
+                cache.set(key, (rendered.content, rendered['Content-Type']), timeout)
+        
+        response = super().list(request, *args, **kwargs)
+        response.add_post_render_callback(store)
+        return response
     
-    def update(self, request, *args, **kwargs):
+    def _list_etag(self, request):
         """
-        Update an accommodation unit and set last_cleaned_at when marked as CLEAN.
+        Build the listing ETag from unit and image counts and last update times,
+        plus the query string (filters, ordering, page, summary) and the Accept header.
         """
-        instance = self.get_object()
-        old_status = instance.status
-        
-        # Perform the update
-        response = super().update(request, *args, **kwargs)
-        
-        # Refresh instance to get updated values
-        instance.refresh_from_db()
-        
-        # If status changed to CLEAN, update last_cleaned_at
-        if old_status != AccommodationUnit.CLEAN and instance.status == AccommodationUnit.CLEAN:
-            instance.last_cleaned_at = timezone.now()
-            instance.save(update_fields=['last_cleaned_at', 'updated_at'])
-            # Refresh serializer data
-            serializer = self.get_serializer(instance)
-            response.data = serializer.data
-        
-        return response
+        stamp = AccommodationUnit.objects.aggregate(
+            unit_count=models.Count('id', distinct=True),
+            unit_updated=models.Max('updated_at'),
+            image_count=models.Count('images', distinct=True),
+            image_updated=models.Max('images__updated_at'),
+        )
+        key = f"{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}|{sorted(stamp.items())}"
+        return quote_etag(hashlib.md5(key.encode()).hexdigest())
     
-    def partial_update(self, request, *args, **kwargs):
+    def retrieve(self, request, *args, **kwargs):
         """
-        Partially update an accommodation unit and set last_cleaned_at when marked as CLEAN.
+        Retrieve an accommodation and check dirty status.
         """
-        instance = self.get_object()
-        old_status = instance.status
-        
-        # Perform the partial update
-        response = super().partial_update(request, *args, **kwargs)
-        
-        # Refresh instance to get updated values
-        instance.refresh_from_db()
-        
-        # If status changed to CLEAN, update last_cleaned_at
-        if old_status != AccommodationUnit.CLEAN and instance.status == AccommodationUnit.CLEAN:
-            instance.last_cleaned_at = timezone.now()
-            instance.save(update_fields=['last_cleaned_at', 'updated_at'])
-            # Refresh serializer data
-            serializer = self.get_serializer(instance)
-            response.data = serializer.data
+        # Check and update dirty status before retrieving
+        self._check_and_update_dirty_status()
         
+        # The unit and its prefetched images are loaded anyway; a matching ETag
+        # skips serializing and rendering them
+        instance = self.get_object()
+        stamp = (instance.updated_at, [(image.pk, image.updated_at) for image in instance.images.all()])
+        key = f"{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}|{stamp}"
+        etag = quote_etag(hashlib.md5(key.encode()).hexdigest())
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
         return response
     
+    def perform_update(self, serializer):
+        """
+        Save the update, setting last_cleaned_at in the same write when the unit is marked as CLEAN.
+        """
+        old_status = serializer.instance.status
+        new_status = serializer.validated_data.get('status', old_status)
+        if old_status != AccommodationUnit.CLEAN and new_status == AccommodationUnit.CLEAN:
+            serializer.save(last_cleaned_at=timezone.now())
+        else:
+            serializer.save()
+    
     @action(detail=False, methods=['get'])
     def export_data(self, request):
         """
@@ -114,48 +184,13 @@ class AccommodationUnitViewSet(viewsets.ModelViewSet):
         Query param: export_format (json or csv, default: json)
         """
         export_format = request.query_params.get('export_format', 'json').lower()
-        units = self.get_queryset()
-        serializer = self.get_serializer(units, many=True)
-        data = serializer.data
-        
-        # Remove fields that shouldn't be exported (auto-generated)
-        export_data = []
-        for unit in data:
-            export_item = {
-                'name': unit.get('name', ''),
-                'max_capacity': unit.get('max_capacity', 0),
-                'base_price': unit.get('base_price', '0.00'),
-                'weekend_price': unit.get('weekend_price', ''),
-                'holiday_price': unit.get('holiday_price', ''),
-                'color_hex': unit.get('color_hex', '#4A90E2'),
-                'status': unit.get('status', 'CLEAN'),
-                'auto_dirty_days': unit.get('auto_dirty_days', 3),
-                'default_check_in_time': unit.get('default_check_in_time', '14:00:00'),
-                'default_check_out_time': unit.get('default_check_out_time', '12:00:00'),
-            }
-            export_data.append(export_item)
         
         if export_format == 'csv':
-            response = HttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = 'attachment; filename="units.csv"'
-            
-            if export_data:
-                writer = csv.DictWriter(response, fieldnames=[
-                    'name', 'max_capacity', 'base_price', 'weekend_price', 'holiday_price',
-                    'color_hex', 'status', 'auto_dirty_days', 'default_check_in_time', 'default_check_out_time'
-                ])
-                writer.writeheader()
-                for row in export_data:
-                    writer.writerow(row)
-            
-            return response
-        else:
-            response = HttpResponse(
-                json.dumps(export_data, ensure_ascii=False, indent=2),
-                content_type='application/json'
-            )
-            response['Content-Disposition'] = 'attachment; filename="units.json"'
-            return response
+            return copy_csv(AccommodationUnit.objects.all(), UNIT_EXPORT_FIELDS, 'units.csv')
+        
+        # Plain column values, fetched in chunks and written as they arrive
+        rows = AccommodationUnit.objects.values(*UNIT_EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        return stream_json(rows, 'units.json')
     
     @action(detail=False, methods=['post'], parser_classes=[MultiPartParser, FormParser, JSONParser])
     def import_data(self, request):
@@ -170,17 +205,15 @@ class AccommodationUnitViewSet(viewsets.ModelViewSet):
         file = request.FILES.get('file')
         
         if file:
-            file_content = file.read().decode('utf-8')
             filename = file.name.lower()
             
             if filename.endswith('.csv'):
-                # Parse CSV
-                reader = csv.DictReader(StringIO(file_content))
-                data = list(reader)
+                # Rows are decoded and parsed lazily, as the import consumes them
+                data = read_csv_upload(file)
             else:
-                # Parse JSON
+                # JSON arrays are also decoded one element at a time
                 try:
-                    data = json.loads(file_content)
+                    data = read_json_upload(file)
                 except json.JSONDecodeError:
                     return Response(
                         {'error': 'Invalid JSON file'},
@@ -190,45 +223,107 @@ class AccommodationUnitViewSet(viewsets.ModelViewSet):
             # Check for JSON body
             data = request.data if isinstance(request.data, list) else request.data.get('data', [])
         
-        if not isinstance(data, list):
+        # A list from JSON, or the row iterator of a CSV upload
+        if not isinstance(data, (list, Iterator)):
             return Response(
                 {'error': 'Data must be a list of accommodation units'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        for idx, unit_data in enumerate(data):
-            try:
-                # Check if unit with same name already exists
-                name = unit_data.get('name', '')
-                existing = AccommodationUnit.objects.filter(name=name).first()
-                
-                if existing:
-                    # Update existing unit
-                    serializer = AccommodationUnitSerializer(existing, data=unit_data, partial=True)
-                else:
-                    # Create new unit
-                    serializer = AccommodationUnitSerializer(data=unit_data)
-                
-                if serializer.is_valid():
-                    serializer.save()
-                    imported_count += 1
+        # Validate and write IMPORT_BATCH_SIZE rows at a time, so a large CSV upload
+        # is never held in memory whole
+        row_count = 0
+        try:
+            with transaction.atomic():
+                for batch in batched(data, IMPORT_BATCH_SIZE):
+                    row_count += len(batch)
+                    batch_count, batch_errors = self._import_batch(batch)
+                    imported_count += batch_count
+                    errors.extend(batch_errors)
+        except json.JSONDecodeError:
+            # Malformed JSON found partway through the upload; nothing was saved
+            return Response(
+                {'error': 'Invalid JSON file'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not row_count:
+            return Response(
+                {'error': 'No accommodation units to import'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response({
+            'imported': imported_count,
+            'errors': errors
+        }, status=status.HTTP_200_OK if imported_count > 0 else status.HTTP_400_BAD_REQUEST)
+    
+    def _import_batch(self, batch):
+        """
+        Import a batch of (index, row) pairs with one name lookup, one bulk_create
+        and one bulk_update. Returns the number of rows imported and the row errors.
+        """
+        imported_count = 0
+        errors = []
+        
+        # One query for every unit the batch refers to by name
+        rows = [unit_data for _, unit_data in batch if isinstance(unit_data, dict)]
+        units_by_name = in_bulk_by(AccommodationUnit, 'name', (unit_data.get('name') for unit_data in rows))
+        to_create = {}
+        to_update = {}
+        update_fields = {'updated_at'}
+        staged = []
+        
+        for idx, unit_data in batch:
+            if not isinstance(unit_data, dict):
+                errors.append({
+                    'index': idx,
+                    'data': unit_data,
+                    'errors': 'Each accommodation unit must be an object'
+                })
+                continue
+            
+            # A unit created or updated earlier in the same batch is updated again;
+            # names are matched the way the serializer stores them (as trimmed text)
+            name = lookup_key(unit_data.get('name'))
+            existing = to_create.get(name) or units_by_name.get(name)
+            serializer = AccommodationUnitImportSerializer(existing, data=unit_data, partial=existing is not None)
+            
+            if serializer.is_valid():
+                if existing is None:
+                    unit = AccommodationUnit(**serializer.validated_data)
+                    to_create[unit.name] = unit
                 else:
-                    errors.append({
-                        'index': idx,
-                        'data': unit_data,
-                        'errors': serializer.errors
-                    })
-            except Exception as e:
+                    for field, value in serializer.validated_data.items():
+                        setattr(existing, field, value)
+                    if existing.pk is not None:
+                        to_update[existing.pk] = existing
+                        update_fields.update(serializer.validated_data)
+                staged.append((idx, unit_data))
+            else:
                 errors.append({
                     'index': idx,
                     'data': unit_data,
-                    'errors': str(e)
+                    'errors': serializer.errors
                 })
         
-        return Response({
-            'imported': imported_count,
-            'errors': errors
-        }, status=status.HTTP_200_OK if imported_count > 0 else status.HTTP_400_BAD_REQUEST)
+        try:
+            # Savepoint, so a batch the database rejects doesn't abort the others
+            with transaction.atomic():
+                AccommodationUnit.objects.bulk_create(to_create.values())
+                if to_update:
+                    # bulk_update skips auto_now, so stamp updated_at explicitly
+                    now = timezone.now()
+                    for unit in to_update.values():
+                        unit.updated_at = now
+                    AccommodationUnit.objects.bulk_update(to_update.values(), fields=sorted(update_fields))
+        except IntegrityError as e:
+            # Nothing from this batch was written; report it on each of its rows
+            errors.extend({'index': idx, 'data': unit_data, 'errors': str(e)} for idx, unit_data in staged)
+        else:
+            imported_count = len(staged)
+        
+        return imported_count, errors
     
     @action(detail=False, methods=['post'])
     def reorder(self, request):
@@ -246,20 +341,17 @@ class AccommodationUnitViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Update display_order for each unit using bulk_update for better performance
-        units_to_update = []
-        for index, unit_id in enumerate(unit_ids):
-            try:
-                unit = AccommodationUnit.objects.get(id=unit_id)
-                unit.display_order = index
-                units_to_update.append(unit)
-            except AccommodationUnit.DoesNotExist:
-                pass  # Skip non-existent units
+        # Position of each id, keyed by string since ids may arrive as "3" or 3 (last wins)
+        positions = {str(unit_id): index for index, unit_id in enumerate(unit_ids)}
         
-        # Bulk update all units
-        if units_to_update:
-            AccommodationUnit.objects.bulk_update(units_to_update, ['display_order'])
-        updated_count = len(units_to_update)
+        # A single UPDATE ... SET display_order = CASE id WHEN ... END; ids that don't
+        # exist are simply not matched. updated_at is set for the list ETag.
+        updated_count = 0
+        if positions:
+            updated_count = AccommodationUnit.objects.filter(pk__in=positions).update(
+                display_order=_position_case(positions),
+                updated_at=timezone.now(),
+            )
         
         return Response({
             'updated': updated_count,
@@ -267,15 +359,15 @@ class AccommodationUnitViewSet(viewsets.ModelViewSet):
         }, status=status.HTTP_200_OK)
 
 
-class DatePriceOverrideViewSet(viewsets.ModelViewSet):
+class DatePriceOverrideViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing DatePriceOverride resources.
     Supports bulk creation and filtering by date range and accommodation unit.
     """
-    queryset = DatePriceOverride.objects.select_related('accommodation_unit').all()
+    queryset = DatePriceOverride.objects.all()
     serializer_class = DatePriceOverrideSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
-    filterset_fields = ['accommodation_unit', 'date']
+    filterset_class = DatePriceOverrideFilter
     ordering_fields = ['date', 'accommodation_unit', 'price']
     ordering = ['date', 'accommodation_unit']
     
@@ -294,6 +386,40 @@ class DatePriceOverrideViewSet(viewsets.ModelViewSet):
         
         return queryset
     
+    @action(detail=False, methods=['get'])
+    def price_map(self, request):
+        """
+        Return custom prices for a date range keyed by "<unit_id>-<date>".
+        Used by the calendar, which only needs the price per unit and date.
+        
+        Query params: start_date, end_date (required), unit_ids (optional, comma-separated)
+        """
+        start_date = parse_date(request.query_params.get('start_date', ''))
+        end_date = parse_date(request.query_params.get('end_date', ''))
+        
+        if not start_date or not end_date:
+            return Response(
+                {'error': 'start_date and end_date are required (YYYY-MM-DD)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        unit_ids = None
+        unit_ids_param = request.query_params.get('unit_ids')
+        if unit_ids_param:
+            try:
+                unit_ids = [int(unit_id) for unit_id in unit_ids_param.split(',') if unit_id.strip()]
+            except ValueError:
+                return Response(
+                    {'error': 'unit_ids must be a comma-separated list of integers'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        prices = get_override_prices(start_date, end_date, unit_ids)
+        return Response({
+            f'{unit_id}-{date.isoformat()}': str(price)
+            for (unit_id, date), price in prices.items()
+        })
+    
     @action(detail=False, methods=['post'])
     def bulk_create(self, request):
         """
@@ -344,29 +470,24 @@ class DatePriceOverrideViewSet(viewsets.ModelViewSet):
             serializer = self.get_serializer(data=items, many=True)
         
         if serializer.is_valid():
-            # Use update_or_create to handle duplicates
-            created_count = 0
-            updated_count = 0
-            errors = []
-            
-            for item_data in serializer.validated_data:
-                try:
-                    obj, created = DatePriceOverride.objects.update_or_create(
-                        accommodation_unit=item_data['accommodation_unit'],
-                        date=item_data['date'],
-                        defaults={'price': item_data['price']}
-                    )
-                    if created:
-                        created_count += 1
-                    else:
-                        updated_count += 1
-                except Exception as e:
-                    errors.append(str(e))
+            # The lookup and the upsert share one transaction, so the counts match what was written
+            with transaction.atomic():
+                # Look up which unit/date pairs already exist so we can report created vs updated
+                pairs = {(item['accommodation_unit'].pk, item['date']) for item in serializer.validated_data}
+                existing_pairs = set(DatePriceOverride.objects.filter(
+                    accommodation_unit_id__in={unit_id for unit_id, _ in pairs},
+                    date__in={date for _, date in pairs}
+                ).values_list('accommodation_unit_id', 'date'))
+                updated_count = len(pairs & existing_pairs)
+                created_count = len(pairs) - updated_count
+                
+                # Upsert everything in one statement
+                serializer.save()
             
             return Response({
                 'created': created_count,
                 'updated': updated_count,
-                'errors': errors
+                'errors': []
             }, status=status.HTTP_201_CREATED if created_count > 0 else status.HTTP_200_OK)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -407,15 +528,15 @@ class DatePriceOverrideViewSet(viewsets.ModelViewSet):
         }, status=status.HTTP_200_OK)
 
 
-class DatePackageViewSet(viewsets.ModelViewSet):
+class DatePackageViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing DatePackage resources.
     Supports bulk creation and filtering by date range and accommodation unit.
     """
-    queryset = DatePackage.objects.select_related('accommodation_unit').all()
+    queryset = DatePackage.objects.all()
     serializer_class = DatePackageSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
-    filterset_fields = ['accommodation_unit', 'name']
+    filterset_class = DatePackageFilter
     ordering_fields = ['start_date', 'end_date', 'created_at']
     ordering = ['-created_at']
     
@@ -460,6 +581,8 @@ class DatePackageViewSet(viewsets.ModelViewSet):
                 {"accommodation_unit": 2, "name": "Natal", "start_date": "2025-12-20", "end_date": "2025-12-26", "color": "#FF5733"}
             ]
         }
+        
+        Returns the created count and ids; query param return=full also includes the packages
         """
         # Check if using bulk format or individual items
         items = request.data.get('items')
@@ -495,11 +618,12 @@ class DatePackageViewSet(viewsets.ModelViewSet):
             serializer = self.get_serializer(data=items, many=True)
         
         if serializer.is_valid():
-            serializer.save()
-            return Response({
-                'created': len(serializer.data),
-                'packages': serializer.data
-            }, status=status.HTTP_201_CREATED)
+            packages = serializer.save()
+            response_data = {'created': len(packages), 'ids': [package.pk for package in packages]}
+            # Serializing the new packages back is opt-in (?return=full); the calendar only needs the count
+            if request.query_params.get('return') == 'full':
+                response_data['packages'] = serializer.data
+            return Response(response_data, status=status.HTTP_201_CREATED)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
@@ -548,7 +672,7 @@ class UnitImageViewSet(viewsets.ModelViewSet):
     serializer_class = UnitImageSerializer
     parser_classes = [MultiPartParser, FormParser, JSONParser]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
-    filterset_fields = ['accommodation_unit']
+    filterset_class = UnitImageFilter
     ordering_fields = ['order', 'created_at']
     ordering = ['accommodation_unit', 'order', 'id']
     
@@ -602,17 +726,28 @@ class UnitImageViewSet(viewsets.ModelViewSet):
             models.Max('order')
         )['order__max'] or -1
         
-        # Create image records
-        created_images = []
-        for idx, image_file in enumerate(images):
-            caption = captions[idx] if idx < len(captions) else ''
-            unit_image = UnitImage.objects.create(
+        # Storage writes (local disk or Cloudinary) are I/O bound, so run them concurrently
+        image_field = UnitImage._meta.get_field('image')
+        upload_target = UnitImage(accommodation_unit=unit)
+        
+        def save_file(image_file):
+            # What FieldFile.save does, minus saving the model instance
+            name = image_field.generate_filename(upload_target, image_file.name)
+            return image_field.storage.save(name, image_file, max_length=image_field.max_length)
+        
+        with ThreadPoolExecutor(max_workers=IMAGE_UPLOAD_WORKERS) as executor:
+            names = list(executor.map(save_file, images))
+        
+        # Then insert every image record at once
+        created_images = UnitImage.objects.bulk_create([
+            UnitImage(
                 accommodation_unit=unit,
-                image=image_file,
+                image=name,
                 order=max_order + idx + 1,
-                caption=caption
+                caption=captions[idx] if idx < len(captions) else ''
             )
-            created_images.append(unit_image)
+            for idx, name in enumerate(names)
+        ])
         
         serializer = self.get_serializer(created_images, many=True)
         return Response({
@@ -636,21 +771,22 @@ class UnitImageViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Update order for each image
-        images_to_update = []
+        # Position of each id, keyed by string since ids may arrive as "3" or 3 (last wins)
+        positions = {str(image_id): index for index, image_id in enumerate(image_ids)}
+        
+        # A single UPDATE ... SET order = CASE id WHEN ... END; updated_at is set for the list ETag
+        updated_count = 0
+        if positions:
+            updated_count = UnitImage.objects.filter(pk__in=positions).update(
+                order=_position_case(positions),
+                updated_at=timezone.now(),
+            )
+        
+        # Only look up which ids were missing when some weren't updated
         skipped_ids = []
-        for index, image_id in enumerate(image_ids):
-            try:
-                image = UnitImage.objects.get(id=image_id)
-                image.order = index
-                images_to_update.append(image)
-            except UnitImage.DoesNotExist:
-                skipped_ids.append(image_id)
-        
-        # Bulk update all images
-        if images_to_update:
-            UnitImage.objects.bulk_update(images_to_update, ['order'])
-        updated_count = len(images_to_update)
+        if updated_count < len(positions):
+            existing = {str(pk) for pk in UnitImage.objects.filter(pk__in=positions).values_list('pk', flat=True)}
+            skipped_ids = [image_id for image_id in image_ids if str(image_id) not in existing]
         
         response_data = {
             'updated': updated_count,
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-16 16:05
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.functions.text
+from core.operations import AddPostgresIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0007_alter_client_phone'),
+        # Creates the pg_trgm extension
+        ('accommodations', '0013_add_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['full_name'], name='client_full_name'),
+        ),
+        AddPostgresIndex(
+            model_name='client',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('full_name'), name='gin_trgm_ops'), name='client_full_name_trgm'),
+        ),
+    ]
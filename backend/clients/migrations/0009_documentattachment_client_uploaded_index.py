@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-16 16:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0008_full_name_indexes'),
+    ]
+
+    operations = [
+        # Create the composite index before dropping the FK's own index
+        migrations.AddIndex(
+            model_name='documentattachment',
+            index=models.Index(fields=['client', '-uploaded_at'], name='docattach_client_ts'),
+        ),
+        migrations.AlterField(
+            model_name='documentattachment',
+            name='client',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='document_attachments', to='clients.client', verbose_name='Cliente'),
+        ),
+    ]
@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 
 class Client(models.Model):
@@ -45,6 +47,13 @@ class Client(models.Model):
         verbose_name = "Cliente"
         verbose_name_plural = "Clientes"
         ordering = ['full_name']
+        indexes = [
+            # Default ordering of the list endpoint
+            models.Index(fields=['full_name'], name='client_full_name'),
+            # Trigram index (PostgreSQL only) backing ?search=, whose icontains
+            # compiles to UPPER(full_name) LIKE UPPER('%term%')
+            GinIndex(OpClass(Upper('full_name'), name='gin_trgm_ops'), name='client_full_name_trgm'),
+        ]
     
     def __str__(self):
         if self.cpf:
@@ -60,7 +69,9 @@ class DocumentAttachment(models.Model):
         Client,
         on_delete=models.CASCADE,
         related_name='document_attachments',
-        verbose_name="Cliente"
+        verbose_name="Cliente",
+        # docattach_client_ts starts with client, so a separate FK index would be redundant
+        db_index=False
     )
     file = models.FileField(
         upload_to='clients/docs/',
@@ -77,6 +88,10 @@ class DocumentAttachment(models.Model):
         verbose_name = "Anexo de Documento"
         verbose_name_plural = "Anexos de Documentos"
         ordering = ['-uploaded_at']
+        indexes = [
+            # Attachments of a client, newest first
+            models.Index(fields=['client', '-uploaded_at'], name='docattach_client_ts'),
+        ]
     
     def __str__(self):
         return f"{self.filename} - {self.client.full_name}"
@@ -1,8 +1,10 @@
 from rest_framework import serializers
 from .models import Client, DocumentAttachment
-from django.db.models import Count, Sum, Avg, F, ExpressionWrapper, DecimalField
+from .stats import client_stats, stats_from
+from core.serializers import CachedFieldsModelSerializer
+from django.db.models import Count, Sum, Avg, F, ExpressionWrapper, DecimalField, Prefetch
 from decimal import Decimal
-import json
+import orjson
 
 
 class FlexibleTagsField(serializers.ListField):
@@ -16,40 +18,15 @@ class FlexibleTagsField(serializers.ListField):
         super().__init__(**kwargs)
     
     def to_internal_value(self, data):
-        """Convert various tag formats to a list."""
-        # Handle string input (JSON or comma-separated)
-        if isinstance(data, str):
-            return self._parse_string_tags(data)
-        # Handle list input
-        elif isinstance(data, list):
-            # Check if it's a list with a single element that is a string
-            if len(data) == 1 and isinstance(data[0], str):
-                # Try to parse as JSON array first (must start with '[')
-                if data[0].strip().startswith('['):
-                    try:
-                        parsed = json.loads(data[0])
-                        if isinstance(parsed, list):
-                            return self._validate_tag_list(parsed)
-                    except (json.JSONDecodeError, ValueError):
-                        # Not valid JSON, treat as regular string
-                        pass
-                
-                # Check if it contains commas (comma-separated tags)
-                if ',' in data[0]:
-                    return [tag.strip() for tag in data[0].split(',') if tag.strip()]
-                # Single tag without commas, treat as a single-element list
-                else:
-                    tag_str = data[0].strip()
-                    return [tag_str] if tag_str else []
-            
-            # Validate each item in the list (multiple elements or non-string element)
-            return self._validate_tag_list(data)
-        # Handle None or missing
-        elif data is None:
-            return []
-        # Handle other types
-        else:
-            return []
+        """Convert various tag formats to a list; None and other types become []."""
+        parse = self._PARSERS.get(type(data))
+        return parse(self, data) if parse else []
+    
+    def _parse_list_tags(self, tags):
+        """Parse a list of tags, or the FormData case of one string holding them all."""
+        if len(tags) == 1 and isinstance(tags[0], str):
+            return self._parse_string_tags(tags[0])
+        return self._validate_tag_list(tags)
     
     def _parse_string_tags(self, tags_str):
         """Parse a string as JSON array or comma-separated tags."""
@@ -57,16 +34,16 @@ class FlexibleTagsField(serializers.ListField):
         if not tags_str:
             return []
         
-        # Try to parse as JSON first (for FormData with JSON.stringify)
-        try:
-            parsed_tags = json.loads(tags_str)
-            if isinstance(parsed_tags, list):
-                return self._validate_tag_list(parsed_tags)
-            else:
-                return []
-        except (json.JSONDecodeError, ValueError):
-            # Fall back to comma-separated parsing
-            return [tag.strip() for tag in tags_str.split(',') if tag.strip()]
+        # Only a leading '[' can be a JSON array (FormData with JSON.stringify), so
+        # plain comma-separated tags never go through the JSON parser
+        if tags_str[0] == '[':
+            try:
+                return self._validate_tag_list(orjson.loads(tags_str))
+            except orjson.JSONDecodeError:
+                pass
+        
+        # Comma-separated parsing
+        return [tag for tag in map(str.strip, tags_str.split(',')) if tag]
     
     def _validate_tag_list(self, tags):
         """Validate and clean a list of tags."""
@@ -77,9 +54,12 @@ class FlexibleTagsField(serializers.ListField):
                 if tag_str:
                     validated_tags.append(tag_str)
         return validated_tags
+    
+    # One dict lookup on the exact input type instead of an isinstance chain
+    _PARSERS = {str: _parse_string_tags, list: _parse_list_tags}
 
 
-class DocumentAttachmentSerializer(serializers.ModelSerializer):
+class DocumentAttachmentSerializer(CachedFieldsModelSerializer):
     """
     Serializador para modelo DocumentAttachment.
     """
@@ -89,7 +69,7 @@ class DocumentAttachmentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'uploaded_at']
 
 
-class ClientSerializer(serializers.ModelSerializer):
+class ClientSerializer(CachedFieldsModelSerializer):
     """
     Serializador para modelo Client.
     Inclui todos os campos para operações de leitura e escrita.
@@ -106,37 +86,11 @@ class ClientSerializer(serializers.ModelSerializer):
         
         # Only include stats if explicitly requested
         if self.context.get('include_stats', False):
-            try:
-                # Calculate statistics
-                reservations = instance.reservations.all()
-                reservations_count = reservations.count()
-                
-                # Total days
-                total_days = 0
-                for res in reservations:
-                    if res.check_in and res.check_out:
-                        # Convert datetime to date for calculation
-                        check_in_date = res.check_in.date() if hasattr(res.check_in, 'date') else res.check_in
-                        check_out_date = res.check_out.date() if hasattr(res.check_out, 'date') else res.check_out
-                        delta = check_out_date - check_in_date
-                        total_days += delta.days
-                
-                # Total paid
-                from django.db.models import Sum
-                from decimal import Decimal
-                total_paid = float(reservations.aggregate(
-                    total=Sum('transactions__amount')
-                )['total'] or Decimal('0.00'))
-                
-                # Average per night
-                avg_per_night = round(total_paid / total_days, 2) if total_days > 0 else 0.0
-                
-                data['reservations_count'] = reservations_count
-                data['total_days_stayed'] = total_days
-                data['total_amount_paid'] = total_paid
-                data['average_price_per_night'] = avg_per_night
-            except:
-                pass
+            # Clients listed through the view come annotated; others cost one query each
+            if hasattr(instance, 'stats_reservations'):
+                data.update(stats_from(instance))
+            else:
+                data.update(client_stats(instance))
         
         return data
     
@@ -169,3 +123,36 @@ class ClientSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Prefetch nested document attachments so listing clients doesn't issue one query per client."""
+        # Ordered by client first so the prefetch reads docattach_client_ts in index order
+        attachments = DocumentAttachment.objects.order_by('client_id', '-uploaded_at')
+        return queryset.prefetch_related(Prefetch('document_attachments', queryset=attachments))
+
+
+class ClientSummarySerializer(ClientSerializer):
+    """
+    Serializador resumido de Client para listagens.
+    Omite endereço, observações e documentos anexados.
+    """
+    document_attachments = None
+    
+    class Meta(ClientSerializer.Meta):
+        fields = [
+            'id',
+            'full_name',
+            'cpf',
+            'phone',
+            'email',
+            'tags',
+            'profile_picture',
+            'created_at',
+            'updated_at',
+        ]
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """The summary doesn't render document attachments, so nothing is prefetched."""
+        return queryset
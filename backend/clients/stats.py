@@ -0,0 +1,51 @@
+"""
+Reservation statistics per client, computed in the database.
+
+Each figure is a correlated subquery, so counting reservations and summing
+their transactions never multiply each other's rows through a shared join.
+"""
+from datetime import timezone as dt_timezone
+from django.db.models import Count, DurationField, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import TruncDate
+from financials.models import Transaction
+from reservations.models import Reservation
+from .models import Client
+
+# Nights are counted between calendar dates of the stored (UTC) check-in and check-out
+STAY_LENGTH = TruncDate('check_out', tzinfo=dt_timezone.utc) - TruncDate('check_in', tzinfo=dt_timezone.utc)
+
+
+def with_stats(queryset):
+    """
+    Annotate clients with stats_reservations, stats_stay (a timedelta of whole
+    days) and stats_paid. Clients without reservations get None.
+    """
+    reservations = Reservation.objects.filter(client=OuterRef('pk')).order_by().values('client')
+    transactions = Transaction.objects.filter(reservation__client=OuterRef('pk')).order_by().values('reservation__client')
+    return queryset.annotate(
+        stats_reservations=Subquery(
+            reservations.annotate(total=Count('id')).values('total'), output_field=IntegerField()
+        ),
+        stats_stay=Subquery(
+            reservations.annotate(total=Sum(STAY_LENGTH, output_field=DurationField())).values('total'),
+            output_field=DurationField()
+        ),
+        stats_paid=Subquery(transactions.annotate(total=Sum('amount')).values('total')),
+    )
+
+
+def stats_from(client):
+    """Return the serialized stats of a client loaded through with_stats."""
+    total_days = client.stats_stay.days if client.stats_stay else 0
+    total_paid = float(client.stats_paid or 0)
+    return {
+        'reservations_count': client.stats_reservations or 0,
+        'total_days_stayed': total_days,
+        'total_amount_paid': total_paid,
+        'average_price_per_night': round(total_paid / total_days, 2) if total_days > 0 else 0.0,
+    }
+
+
+def client_stats(client):
+    """Return the stats of a single client, with one query."""
+    return stats_from(with_stats(Client.objects.filter(pk=client.pk).only('pk')).get())
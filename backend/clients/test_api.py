@@ -1,9 +1,16 @@
 from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework.authtoken.models import Token
-from .models import Client
+from .models import Client, DocumentAttachment
+from accommodations.models import AccommodationUnit
+from financials.models import Transaction
+from reservations.models import Reservation
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
 from django.core.files.uploadedfile import SimpleUploadedFile
 from PIL import Image
 import io
@@ -14,37 +21,139 @@ class ClientAPITest(TestCase):
     Test suite for Client API endpoints.
     """
     
-    def setUp(self):
-        """Set up test client and sample data."""
-        self.client = APIClient()
-        
-        # Create a test user and authenticate
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Create the test user and sample data once for the whole class."""
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass123'
         )
-        self.token = Token.objects.create(user=self.user)
-        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        cls.token = Token.objects.create(user=cls.user)
         
-        self.client1 = Client.objects.create(
+        cls.client1 = Client.objects.create(
             full_name="João Silva",
             cpf="123.456.789-00",
             phone="+55 (11) 98765-4321",
             email="joao@example.com"
         )
-        self.client2 = Client.objects.create(
+        cls.client2 = Client.objects.create(
             full_name="Maria Santos",
             cpf="987.654.321-00",
             phone="+55 (21) 91234-5678",
             email="maria@example.com"
         )
     
+    def setUp(self):
+        """Set up an authenticated test client."""
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+    
     def test_list_clients(self):
         """Test listing all clients."""
         response = self.client.get('/api/clients/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 2)
     
+    def test_list_prefetches_document_attachments(self):
+        """Test that listing clients loads all document attachments in one query."""
+        DocumentAttachment.objects.bulk_create([
+            DocumentAttachment(client=client, file=f'clients/docs/{client.pk}.pdf', filename=f'{client.pk}.pdf')
+            for client in (self.client1, self.client2)
+        ])
+        # Token lookup, page count, clients, attachments
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/clients/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([len(c['document_attachments']) for c in response.data['results']], [1, 1])
+    
+    def test_list_summary_omits_heavy_fields(self):
+        """Test that ?summary=true lists clients without address, notes or documents."""
+        Client.objects.filter(pk=self.client1.pk).update(notes="Observação longa", address="Rua A, 1")
+        # Token lookup, page count, clients (no attachments prefetch)
+        with CaptureQueriesContext(connection) as context:
+            with self.assertNumQueries(3):
+                response = self.client.get('/api/clients/?summary=true')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.data['results'][0]
+        self.assertEqual(result['full_name'], self.client1.full_name)
+        for field in ('address', 'notes', 'document_attachments'):
+            self.assertNotIn(field, result)
+        self.assertNotIn('notes', context.captured_queries[-1]['sql'])
+    
+    def test_import_matches_existing_clients_by_cpf(self):
+        """Test that import updates clients found by CPF, including ones created earlier in the upload."""
+        data = [
+            {'full_name': 'João Souza', 'cpf': '123.456.789-00'},
+            {'full_name': 'Ana Lima', 'cpf': '111.222.333-44'},
+            {'full_name': 'Ana Lima Costa', 'cpf': '111.222.333-44'},
+        ]
+        response = self.client.post('/api/clients/import_data/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imported'], 3)
+        self.assertEqual(Client.objects.count(), 3)
+        self.client1.refresh_from_db()
+        self.assertEqual(self.client1.full_name, 'João Souza')
+        self.assertEqual(Client.objects.get(cpf='111.222.333-44').full_name, 'Ana Lima Costa')
+    
+    def test_import_numeric_cpf_updates_existing_client(self):
+        """Test that a numeric CPF matches the existing client stored with the same digits."""
+        guest = Client.objects.create(full_name="Ana Lima", cpf="11122233344")
+        response = self.client.post(
+            '/api/clients/import_data/', [{'full_name': 'Ana Lima Costa', 'cpf': 11122233344}], format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imported'], 1)
+        guest.refresh_from_db()
+        self.assertEqual(guest.full_name, 'Ana Lima Costa')
+        self.assertEqual(Client.objects.count(), 3)
+    
+    def test_retrieve_includes_stats(self):
+        """Test that the detail view includes reservation stats, computed in one query."""
+        unit = AccommodationUnit.objects.create(name='Chalé 1', max_capacity=4, base_price=Decimal('250.00'))
+        check_in = datetime(2025, 3, 1, 14, 0, tzinfo=dt_timezone.utc)
+        stays = [
+            # Counted by calendar date: 2 nights even though it is under 48 hours
+            (check_in, check_in + timedelta(days=1, hours=22)),
+            (check_in + timedelta(days=10), check_in + timedelta(days=13)),
+        ]
+        for start, end in stays:
+            reservation = Reservation.objects.create(
+                accommodation_unit=unit, client=self.client1, check_in=start, check_out=end
+            )
+        Transaction.objects.bulk_create([
+            Transaction(reservation=reservation, amount=amount, transaction_type=Transaction.INCOME,
+                        payment_method=Transaction.PIX, due_date=date(2025, 3, 1))
+            for amount in (Decimal('300.00'), Decimal('200.00'))
+        ])
+        
+        # Token lookup, client with its stats, document attachments
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/clients/{self.client1.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['reservations_count'], 2)
+        self.assertEqual(response.data['total_days_stayed'], 5)
+        self.assertEqual(response.data['total_amount_paid'], 500.0)
+        self.assertEqual(response.data['average_price_per_night'], 100.0)
+        
+        response = self.client.get(f'/api/clients/{self.client2.id}/')
+        self.assertEqual(
+            [response.data[key] for key in ('reservations_count', 'total_days_stayed', 'total_amount_paid')],
+            [0, 0, 0.0]
+        )
+    
+    def test_list_with_stats_does_not_query_per_client(self):
+        """Test that ?include_stats=true computes the stats of the whole page in the listing query."""
+        unit = AccommodationUnit.objects.create(name='Chalé 1', max_capacity=4, base_price=Decimal('250.00'))
+        check_in = datetime(2025, 3, 1, 14, 0, tzinfo=dt_timezone.utc)
+        Reservation.objects.create(
+            accommodation_unit=unit, client=self.client2, check_in=check_in, check_out=check_in + timedelta(days=3)
+        )
+        # Token lookup, page count, clients with their stats, document attachments
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/clients/', {'include_stats': 'true'})
+        stats = {c['full_name']: (c['reservations_count'], c['total_days_stayed']) for c in response.data['results']}
+        self.assertEqual(stats, {'João Silva': (0, 0), 'Maria Santos': (1, 3)})
+    
     def test_create_client(self):
         """Test creating a new client."""
         data = {
@@ -1,5 +1,6 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 from .models import Client
+from .serializers import FlexibleTagsField
 
 
 class ClientModelTest(TestCase):
@@ -78,3 +79,38 @@ class ClientModelTest(TestCase):
         self.assertIn("VIP", client.tags)
         self.assertEqual(len(client.tags), 3)
 
+
+
+class FlexibleTagsFieldTest(SimpleTestCase):
+    """Test suite for FlexibleTagsField parsing."""
+    
+    def test_string_formats(self):
+        """Test JSON arrays, comma-separated text and malformed arrays."""
+        field = FlexibleTagsField()
+        cases = {
+            '["VIP", " Frequent ", "", 3]': ['VIP', 'Frequent', '3'],
+            ' VIP, ,Premium ': ['VIP', 'Premium'],
+            '[VIP], Premium': ['[VIP]', 'Premium'],
+            '2024': ['2024'],
+            '  ': [],
+        }
+        for value, expected in cases.items():
+            with self.subTest(value=value):
+                self.assertEqual(field.to_internal_value(value), expected)
+    
+    def test_single_string_in_list(self):
+        """Test the FormData case, where the string arrives as a one-element list."""
+        field = FlexibleTagsField()
+        self.assertEqual(field.to_internal_value(['["a", "b"]']), ['a', 'b'])
+        self.assertEqual(field.to_internal_value(['[a, b']), ['[a', 'b'])
+        self.assertEqual(field.to_internal_value(['VIP']), ['VIP'])
+    
+    def test_lists_and_other_types(self):
+        """Test that lists are cleaned item by item and anything else becomes an empty list."""
+        field = FlexibleTagsField()
+        self.assertEqual(field.to_internal_value(['VIP', ' Premium ', None, 3]), ['VIP', 'Premium', '3'])
+        self.assertEqual(field.to_internal_value(['  ']), [])
+        self.assertEqual(field.to_internal_value([]), [])
+        for value in (None, 3, {'tag': 'VIP'}):
+            with self.subTest(value=value):
+                self.assertEqual(field.to_internal_value(value), [])
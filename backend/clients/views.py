@@ -6,12 +6,16 @@ from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.db import transaction
 from django.db.models import Q, Value, CharField
 from django.db.models.functions import Replace
-from django.http import HttpResponse
 import json
-import csv
-from io import StringIO
+from collections.abc import Iterator
 from .models import Client, DocumentAttachment
-from .serializers import ClientSerializer, DocumentAttachmentSerializer
+from .serializers import ClientSerializer, ClientSummarySerializer, DocumentAttachmentSerializer
+from .stats import with_stats
+from core.exports import EXPORT_CHUNK_SIZE, stream_csv, stream_json
+from core.imports import batched, in_bulk_by, lookup_key, read_csv_upload, read_json_upload
+from core.mixins import EagerLoadingMixin
+
+CLIENT_EXPORT_FIELDS = ('full_name', 'cpf', 'phone', 'email', 'address', 'notes', 'tags')
 
 
 class UnformattedPhoneSearchFilter(SearchFilter):
@@ -64,7 +68,7 @@ class UnformattedPhoneSearchFilter(SearchFilter):
         return queryset
 
 
-class ClientViewSet(viewsets.ModelViewSet):
+class ClientViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing Client resources.
     
@@ -79,11 +83,33 @@ class ClientViewSet(viewsets.ModelViewSet):
     ordering_fields = ['full_name', 'created_at']
     ordering = ['full_name']
     
+    def _include_stats(self):
+        """Only include stats for retrieve (single client) or when explicitly requested."""
+        return self.action == 'retrieve' or self.request.query_params.get('include_stats') == 'true'
+    
+    def _is_summary(self):
+        """Whether the client asked for the slim listing (?summary=true)."""
+        return self.action == 'list' and self.request.query_params.get('summary') == 'true'
+    
+    def get_serializer_class(self):
+        if self._is_summary():
+            return ClientSummarySerializer
+        return super().get_serializer_class()
+    
+    def get_queryset(self):
+        """Compute the stats for every client on the page in the same SELECT, when they are included."""
+        queryset = super().get_queryset()
+        if self._is_summary():
+            # Skip the address and notes text columns the summary doesn't render
+            queryset = queryset.only(*ClientSummarySerializer.Meta.fields)
+        if self._include_stats():
+            queryset = with_stats(queryset)
+        return queryset
+    
     def get_serializer_context(self):
         """Add context to serializer - include stats only for detail view"""
         context = super().get_serializer_context()
-        # Only include stats for retrieve (single client) or when explicitly requested
-        context['include_stats'] = self.action == 'retrieve' or self.request.query_params.get('include_stats') == 'true'
+        context['include_stats'] = self._include_stats()
         return context
     
     def create(self, request, *args, **kwargs):
@@ -184,45 +210,39 @@ class ClientViewSet(viewsets.ModelViewSet):
         
         # Calculate statistics for each client
         client_stats = []
-        errors = []
         for client in clients:
-            try:
-                reservations = client.reservations.all()
-                reservations_count = reservations.count()
-                
-                # Calculate total days
-                total_days = 0
-                for res in reservations:
-                    if res.check_in and res.check_out:
-                        # Convert datetime to date for calculation
-                        check_in_date = res.check_in.date() if hasattr(res.check_in, 'date') else res.check_in
-                        check_out_date = res.check_out.date() if hasattr(res.check_out, 'date') else res.check_out
-                        delta = check_out_date - check_in_date
-                        total_days += delta.days
-                
-                # Calculate total paid
-                total_paid = float(reservations.aggregate(
-                    total=Sum('transactions__amount')
-                )['total'] or Decimal('0.00'))
-                
-                # Calculate average per night
-                avg_per_night = round(total_paid / total_days, 2) if total_days > 0 else 0.0
-                
-                client_stats.append({
-                    'id': client.id,
-                    'full_name': client.full_name,
-                    'cpf': client.cpf or '',
-                    'phone': client.phone or '',
-                    'email': client.email or '',
-                    'reservations_count': reservations_count,
-                    'total_days_stayed': total_days,
-                    'total_amount_paid': total_paid,
-                    'average_price_per_night': avg_per_night,
-                })
-            except Exception as e:
-                # Log error but continue
-                errors.append(f"Error with client {client.id}: {str(e)}")
-                continue
+            reservations = client.reservations.all()
+            reservations_count = reservations.count()
+            
+            # Calculate total days
+            total_days = 0
+            for res in reservations:
+                if res.check_in and res.check_out:
+                    # Convert datetime to date for calculation
+                    check_in_date = res.check_in.date() if hasattr(res.check_in, 'date') else res.check_in
+                    check_out_date = res.check_out.date() if hasattr(res.check_out, 'date') else res.check_out
+                    delta = check_out_date - check_in_date
+                    total_days += delta.days
+            
+            # Calculate total paid
+            total_paid = float(reservations.aggregate(
+                total=Sum('transactions__amount')
+            )['total'] or Decimal('0.00'))
+            
+            # Calculate average per night
+            avg_per_night = round(total_paid / total_days, 2) if total_days > 0 else 0.0
+            
+            client_stats.append({
+                'id': client.id,
+                'full_name': client.full_name,
+                'cpf': client.cpf or '',
+                'phone': client.phone or '',
+                'email': client.email or '',
+                'reservations_count': reservations_count,
+                'total_days_stayed': total_days,
+                'total_amount_paid': total_paid,
+                'average_price_per_night': avg_per_night,
+            })
         
         # Create rankings
         rankings = {
@@ -278,43 +298,12 @@ class ClientViewSet(viewsets.ModelViewSet):
         Query param: export_format (json or csv, default: json)
         """
         export_format = request.query_params.get('export_format', 'json').lower()
-        clients = self.get_queryset()
-        serializer = self.get_serializer(clients, many=True)
-        data = serializer.data
-        
-        # Remove fields that shouldn't be exported (auto-generated)
-        export_data = []
-        for client in data:
-            export_item = {
-                'full_name': client.get('full_name', ''),
-                'cpf': client.get('cpf', ''),
-                'phone': client.get('phone', ''),
-                'email': client.get('email', ''),
-                'address': client.get('address', ''),
-                'notes': client.get('notes', ''),
-                'tags': client.get('tags', []),
-            }
-            export_data.append(export_item)
+        # Plain column values, fetched in chunks and written as they arrive
+        rows = self.get_queryset().values(*CLIENT_EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
         
         if export_format == 'csv':
-            response = HttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = 'attachment; filename="clients.csv"'
-            
-            if export_data:
-                writer = csv.DictWriter(response, fieldnames=['full_name', 'cpf', 'phone', 'email', 'address', 'notes', 'tags'])
-                writer.writeheader()
-                for row in export_data:
-                    row['tags'] = json.dumps(row['tags']) if row['tags'] else '[]'
-                    writer.writerow(row)
-            
-            return response
-        else:
-            response = HttpResponse(
-                json.dumps(export_data, ensure_ascii=False, indent=2),
-                content_type='application/json'
-            )
-            response['Content-Disposition'] = 'attachment; filename="clients.json"'
-            return response
+            return stream_csv(rows, CLIENT_EXPORT_FIELDS, 'clients.csv', json_fields=['tags'])
+        return stream_json(rows, 'clients.json')
     
     @action(detail=False, methods=['post'], parser_classes=[MultiPartParser, FormParser, JSONParser])
     def import_data(self, request):
@@ -329,24 +318,15 @@ class ClientViewSet(viewsets.ModelViewSet):
         file = request.FILES.get('file')
         
         if file:
-            file_content = file.read().decode('utf-8')
             filename = file.name.lower()
             
             if filename.endswith('.csv'):
-                # Parse CSV
-                reader = csv.DictReader(StringIO(file_content))
-                data = []
-                for row in reader:
-                    if 'tags' in row and row['tags']:
-                        try:
-                            row['tags'] = json.loads(row['tags'])
-                        except json.JSONDecodeError:
-                            row['tags'] = []
-                    data.append(row)
+                # Rows are decoded and parsed lazily, as the import consumes them
+                data = read_csv_upload(file, json_fields=['tags'])
             else:
-                # Parse JSON
+                # JSON arrays are also decoded one element at a time
                 try:
-                    data = json.loads(file_content)
+                    data = read_json_upload(file)
                 except json.JSONDecodeError:
                     return Response(
                         {'error': 'Invalid JSON file'},
@@ -356,43 +336,61 @@ class ClientViewSet(viewsets.ModelViewSet):
             # Check for JSON body
             data = request.data if isinstance(request.data, list) else request.data.get('data', [])
         
-        if not isinstance(data, list):
+        # A list from JSON, or the row iterator of a CSV upload
+        if not isinstance(data, (list, Iterator)):
             return Response(
                 {'error': 'Data must be a list of clients'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        for idx, client_data in enumerate(data):
-            try:
-                # Check if client with same CPF already exists (only if CPF is provided)
-                cpf = client_data.get('cpf', '').strip()
-                existing = None
-                
-                if cpf:
-                    existing = Client.objects.filter(cpf=cpf).first()
-                
-                if existing:
-                    # Update existing client
-                    serializer = ClientSerializer(existing, data=client_data, partial=True)
-                else:
-                    # Create new client
-                    serializer = ClientSerializer(data=client_data)
-                
-                if serializer.is_valid():
-                    serializer.save()
-                    imported_count += 1
-                else:
-                    errors.append({
-                        'index': idx,
-                        'data': client_data,
-                        'errors': serializer.errors
-                    })
-            except Exception as e:
-                errors.append({
-                    'index': idx,
-                    'data': client_data,
-                    'errors': str(e)
-                })
+        # One transaction for the whole import instead of a commit per row
+        try:
+            with transaction.atomic():
+                for batch in batched(data):
+                    # One query for the existing clients referenced by the batch
+                    clients_by_cpf = in_bulk_by(
+                        Client, 'cpf', (row.get('cpf') for _, row in batch if isinstance(row, dict))
+                    )
+                    
+                    for idx, client_data in batch:
+                        try:
+                            # Check if client with same CPF already exists (only if CPF is provided)
+                            cpf = lookup_key(client_data.get('cpf'))
+                            existing = clients_by_cpf.get(cpf) if cpf else None
+                            
+                            if existing:
+                                # Update existing client
+                                serializer = ClientSerializer(existing, data=client_data, partial=True)
+                            else:
+                                # Create new client
+                                serializer = ClientSerializer(data=client_data)
+                            
+                            if serializer.is_valid():
+                                # Savepoint per row, so a failed write doesn't abort the others
+                                with transaction.atomic():
+                                    client = serializer.save()
+                                if cpf:
+                                    # A later row with the same CPF updates this client
+                                    clients_by_cpf[cpf] = client
+                                imported_count += 1
+                            else:
+                                errors.append({
+                                    'index': idx,
+                                    'data': client_data,
+                                    'errors': serializer.errors
+                                })
+                        except Exception as e:
+                            errors.append({
+                                'index': idx,
+                                'data': client_data,
+                                'errors': str(e)
+                            })
+        except json.JSONDecodeError:
+            # Malformed JSON found partway through the upload; nothing was saved
+            return Response(
+                {'error': 'Invalid JSON file'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         return Response({
             'imported': imported_count,
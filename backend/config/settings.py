@@ -73,6 +73,11 @@ MIDDLEWARE = [
     'core.middleware.RobotsMiddleware',
 ]
 
+# In development, log SQL statements repeated this many times in one request (likely N+1s)
+QUERY_REPEAT_THRESHOLD = int(os.environ.get('QUERY_REPEAT_THRESHOLD', '5'))
+if DEBUG:
+    MIDDLEWARE.append('core.middleware.QueryInspectorMiddleware')
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -167,11 +172,39 @@ else:
     # Use local file storage when Cloudinary is not configured
     DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
 
+# Cache
+# Use Redis when REDIS_URL is provided, otherwise Django's per-process local memory cache
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+
+# Seconds to cache custom price lookups for the calendar (0 disables caching).
+# Only enabled by default with a shared cache, since local memory caches are not
+# invalidated across worker processes.
+PRICE_CACHE_TIMEOUT = int(os.environ.get('PRICE_CACHE_TIMEOUT', '300' if os.environ.get('REDIS_URL') else '0'))
+
+# Seconds to keep rendered accommodation listings (0 disables caching). Entries are
+# keyed by the data's fingerprint, so even per-process caches never serve stale data.
+UNIT_LIST_CACHE_TIMEOUT = int(os.environ.get('UNIT_LIST_CACHE_TIMEOUT', '300'))
+
+# Mark overdue CLEAN units as DIRTY when accommodations are listed or retrieved.
+# Set to False when `manage.py mark_dirty_units` runs on a schedule (e.g. cron).
+AUTO_DIRTY_ON_READ = os.environ.get('AUTO_DIRTY_ON_READ', 'True') == 'True'
+# Minimum seconds between those read-triggered checks (0 checks on every request)
+AUTO_DIRTY_CHECK_INTERVAL = int(os.environ.get('AUTO_DIRTY_CHECK_INTERVAL', '60'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Covering indexes only take their INCLUDE columns on PostgreSQL; SQLite (local dev) ignores them
+SILENCED_SYSTEM_CHECKS = ['models.W040']
+
 # CORS settings
 # Allow localhost ports for development
 CORS_ALLOWED_ORIGINS = [
@@ -195,6 +228,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.OrjsonRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 # Static files production settings
@@ -0,0 +1,136 @@
+import codecs
+import csv
+import json
+from itertools import islice
+
+# Rows validated and written together by the import_data actions
+IMPORT_BATCH_SIZE = 500
+
+
+def read_csv_upload(file, json_fields=()):
+    """
+    Yield the rows of an uploaded CSV file as dicts, decoding it line by line
+    instead of reading the whole upload into memory.
+    Non-empty values in json_fields are parsed as JSON ([] when invalid).
+    Rows come out as csv.DictReader would build them.
+    """
+    # csv.reader + zip skips DictReader's per-row Python bookkeeping
+    reader = csv.reader(codecs.iterdecode(file, 'utf-8'))
+    header = next(reader, None)
+    if header is None:
+        return
+    width = len(header)
+    for values in reader:
+        if len(values) == width:
+            row = dict(zip(header, values))
+        elif not values:
+            # DictReader skips blank lines
+            continue
+        else:
+            # Short rows are padded with None; extra values go under the None key
+            row = dict(zip(header, values + [None] * (width - len(values))))
+            if len(values) > width:
+                row[None] = values[width:]
+        for field in json_fields:
+            if row.get(field):
+                try:
+                    row[field] = json.loads(row[field])
+                except json.JSONDecodeError:
+                    row[field] = []
+        yield row
+
+
+def batched(rows, size=IMPORT_BATCH_SIZE):
+    """
+    Yield lists of (index, row) pairs, size rows at a time, so an import can
+    look up the existing records for a whole batch with one query.
+    """
+    rows = enumerate(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def lookup_key(value):
+    """
+    Return an imported value as the text a CharField stores it as (e.g. a
+    numeric CPF becomes '12345678900'), trimmed. None stays None.
+    """
+    return None if value is None else str(value).strip()
+
+
+def in_bulk_by(model, field_name, values):
+    """
+    Map each of the given values, normalised with lookup_key, to the model
+    instance whose unique field_name matches it, with one query. Look results
+    up with lookup_key too. Blank and None values are skipped.
+    """
+    values = set(filter(None, map(lookup_key, values)))
+    return model.objects.in_bulk(values, field_name=field_name)
+
+
+def read_json_upload(file, chunk_size=None):
+    """
+    Return the elements of an uploaded JSON array as an iterator, decoding them
+    one at a time as the file is read instead of loading the whole document.
+    Any other top-level value is returned fully parsed, for the caller to reject.
+    Malformed input raises json.JSONDecodeError, possibly while iterating.
+    """
+    chunks = codecs.iterdecode(file.chunks(chunk_size), 'utf-8')
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk
+        if buffer.strip():
+            break
+    buffer = buffer.lstrip()
+    if not buffer.startswith('['):
+        return json.loads(buffer + ''.join(chunks))
+    return _iter_json_array(buffer[1:], chunks)
+
+
+def _iter_json_array(buffer, chunks):
+    """Yield the elements of a JSON array whose opening '[' was already consumed."""
+    decoder = json.JSONDecoder()
+    consumed = 1  # offset of buffer in the document, for error positions
+    exhausted = False
+    first = True
+    expect_value = True
+
+    while True:
+        stripped = buffer.lstrip()
+        consumed += len(buffer) - len(stripped)
+        buffer = stripped
+        if not buffer:
+            if exhausted:
+                raise json.JSONDecodeError('Unterminated array', '', consumed)
+            buffer = next(chunks, '')
+            exhausted = not buffer
+            continue
+
+        if expect_value and not (first and buffer[0] == ']'):
+            try:
+                value, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError as error:
+                if exhausted:
+                    raise json.JSONDecodeError(error.msg, '', consumed + error.pos) from None
+                end = None
+            # A value may continue in the next chunk (e.g. a number cut in half)
+            if (end is None or end == len(buffer)) and not exhausted:
+                more = next(chunks, '')
+                exhausted = not more
+                buffer += more
+                continue
+            yield value
+            buffer = buffer[end:]
+            consumed += end
+            first = expect_value = False
+        elif buffer[0] == ']':
+            rest = buffer[1:] + ''.join(chunks)
+            if rest.strip():
+                raise json.JSONDecodeError('Extra data', '', consumed + 1)
+            return
+        elif buffer[0] == ',' and not expect_value:
+            buffer = buffer[1:]
+            consumed += 1
+            expect_value = True
+        else:
+            raise json.JSONDecodeError("Expecting ',' delimiter", '', consumed)
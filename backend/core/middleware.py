@@ -1,6 +1,12 @@
 """
 Middleware for core app.
 """
+import logging
+from collections import Counter
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
 
 
 class RobotsMiddleware:
@@ -15,3 +21,31 @@ class RobotsMiddleware:
         response = self.get_response(request)
         response['X-Robots-Tag'] = 'noindex, nofollow'
         return response
+
+
+class QueryInspectorMiddleware:
+    """
+    Development middleware that logs SQL statements repeated within a single request,
+    the signature of N+1 reads and per-row save loops.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = settings.QUERY_REPEAT_THRESHOLD
+    
+    def __call__(self, request):
+        # SQL is counted before parameters are bound, so a loop over rows repeats one statement
+        statements = Counter()
+        
+        def record(execute, sql, params, many, context):
+            statements[sql] += 1
+            return execute(sql, params, many, context)
+        
+        with connection.execute_wrapper(record):
+            response = self.get_response(request)
+        
+        for sql, count in statements.most_common():
+            if count < self.threshold:
+                break
+            logger.warning('%s %s ran the same query %d times: %s', request.method, request.path, count, sql)
+        return response
@@ -0,0 +1,13 @@
+class EagerLoadingMixin:
+    """
+    Applies the serializer's setup_eager_loading(queryset) hook, when it defines one.
+    Each serializer declares the relations it renders next to its fields, so views
+    pick up new select_related/prefetch_related needs without changes.
+    """
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        setup_eager_loading = getattr(self.get_serializer_class(), 'setup_eager_loading', None)
+        if setup_eager_loading is not None:
+            queryset = setup_eager_loading(queryset)
+        return queryset
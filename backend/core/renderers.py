@@ -0,0 +1,23 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+
+class OrjsonRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson, which encodes responses several times faster than json.dumps.
+    Types orjson doesn't handle the same way (Decimal, datetimes, lazy strings...) are passed to
+    DRF's encoder so the output matches JSONRenderer. Indented output (browsable API) uses DRF.
+    """
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        # Like JSONRenderer, escape the line separators that are valid JSON but invalid JavaScript
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
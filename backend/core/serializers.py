@@ -0,0 +1,18 @@
+import copy
+from rest_framework import serializers
+
+
+class CachedFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer that introspects its model to build fields once per class.
+    Each serializer instance receives deep copies, so field binding works as usual.
+    """
+    
+    def get_fields(self):
+        cls = type(self)
+        # Look only at this class's own __dict__ so subclasses build their own fields
+        fields = cls.__dict__.get('_cached_fields')
+        if fields is None:
+            fields = super().get_fields()
+            cls._cached_fields = fields
+        return copy.deepcopy(fields)
@@ -1,3 +1,346 @@
-from django.test import TestCase
+from collections.abc import Iterator
+from datetime import date, datetime, time, timezone as dt_timezone
+from decimal import Decimal
+import csv
+import io
+import json
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+from accommodations.models import AccommodationUnit
+from clients.models import Client
+from financials.models import Transaction
+from reservations.models import Reservation
+from .exports import copy_csv, iter_written, stream_csv, stream_json
+from .imports import read_csv_upload, read_json_upload
+from .middleware import QueryInspectorMiddleware
+from .renderers import OrjsonRenderer
 
-# Create your tests here.
+
+class OrjsonRendererTest(SimpleTestCase):
+    """Test suite for OrjsonRenderer."""
+    
+    def test_matches_json_renderer_output(self):
+        """Test that orjson output is byte-for-byte the same as DRF's JSONRenderer."""
+        data = {
+            'results': [ReturnDict({'id': 1, 'name': 'Chalé Ipê', 'price': '250.00'}, serializer=None)],
+            'decimal': Decimal('12.50'),
+            'datetime': datetime(2025, 12, 25, 14, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            'date': date(2025, 12, 25),
+            'lazy': gettext_lazy('Not found.'),
+            'separators': 'a\u2028b\u2029c',
+            1: None,
+            'nested': {'count': 0, 'ok': True, 'ratio': 0.5},
+        }
+        self.assertEqual(OrjsonRenderer().render(data), JSONRenderer().render(data))
+    
+    def test_none_renders_empty(self):
+        """Test that empty responses (e.g. 204) render no body."""
+        self.assertEqual(OrjsonRenderer().render(None), b'')
+    
+    def test_indented_output_uses_json_renderer(self):
+        """Test that indent requests fall back to DRF's encoder."""
+        data = {'a': [1, 2]}
+        context = {'indent': 4}
+        self.assertEqual(
+            OrjsonRenderer().render(data, 'application/json', context),
+            JSONRenderer().render(data, 'application/json', context)
+        )
+
+
+class StreamingExportTest(SimpleTestCase):
+    """
+    Tests for the streamed CSV/JSON export responses.
+    """
+    
+    def _content(self, response):
+        return b''.join(response.streaming_content).decode()
+    
+    def test_json_array(self):
+        rows = iter([{'price': Decimal('10.50'), 'day': date(2025, 1, 2)}, {'price': None, 'day': None}])
+        response = stream_json(rows, 'items.json')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="items.json"')
+        self.assertEqual(
+            self._content(response),
+            '[{"price":"10.50","day":"2025-01-02"},{"price":null,"day":null}]'
+        )
+    
+    def test_json_matches_django_encoder(self):
+        """Test that datetimes, times and non-ASCII text are written as DjangoJSONEncoder writes them."""
+        row = {
+            'at': datetime(2025, 3, 1, 17, 0, 0, 123456, tzinfo=dt_timezone.utc),
+            'time': time(14, 0),
+            'name': 'Chalé',
+        }
+        self.assertEqual(
+            json.loads(self._content(stream_json(iter([row]), 'items.json'))),
+            [json.loads(json.dumps(row, cls=DjangoJSONEncoder))]
+        )
+        self.assertIn('Chalé', self._content(stream_json(iter([row]), 'items.json')))
+    
+    def test_json_empty(self):
+        self.assertEqual(self._content(stream_json(iter([]), 'items.json')), '[]')
+    
+    def test_csv_json_fields(self):
+        rows = iter([{'name': 'Ana', 'tags': ['vip']}, {'name': 'Bia', 'tags': []}])
+        response = stream_csv(rows, ['name', 'tags'], 'items.csv', json_fields=['tags'])
+        self.assertEqual(self._content(response), 'name,tags\r\nAna,"[""vip""]"\r\nBia,[]\r\n')
+    
+    def test_csv_single_column(self):
+        response = stream_csv(iter([{'name': 'Ana, Bia'}, {'name': None}]), ('name',), 'items.csv')
+        self.assertEqual(self._content(response), 'name\r\n"Ana, Bia"\r\n""\r\n')
+
+
+class CopyCsvTest(TestCase):
+    """
+    Tests for copy_csv.
+    """
+    
+    def test_matches_dict_rows(self):
+        AccommodationUnit.objects.create(name='Chalé, 1', max_capacity=4, base_price=Decimal('250.00'))
+        AccommodationUnit.objects.create(name='Suíte "2"', max_capacity=2, base_price=Decimal('99.90'))
+        fields = ('name', 'base_price', 'weekend_price', 'default_check_in_time')
+        queryset = AccommodationUnit.objects.order_by('name')
+        
+        response = copy_csv(queryset, fields, 'units.csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="units.csv"')
+        expected = stream_csv(queryset.values(*fields), fields, 'units.csv')
+        self.assertEqual(b''.join(response.streaming_content), b''.join(expected.streaming_content))
+    
+    def test_postgresql_streams_copy_output(self):
+        """Test that on PostgreSQL the COPY output is streamed from a worker thread's own connection."""
+        cursor = mock.MagicMock()
+        cursor.mogrify.return_value = b'SELECT "name" FROM "accommodations_accommodationunit"'
+        cursor.copy_expert.side_effect = lambda sql, out: out.write(b'name\r\n' + b'Chal\xc3\xa9\r\n' * 50000)
+        fake_connection = mock.MagicMock(vendor='postgresql')
+        fake_connection.cursor.return_value.__enter__.return_value = cursor
+        
+        with mock.patch('core.exports.connection', fake_connection):
+            response = copy_csv(AccommodationUnit.objects.all(), ('name',), 'units.csv')
+            self.assertFalse(cursor.copy_expert.called)
+            content = b''.join(response.streaming_content)
+        
+        self.assertEqual(content, b'name\r\n' + 'Chalé\r\n'.encode() * 50000)
+        self.assertEqual(
+            cursor.copy_expert.call_args.args[0],
+            'COPY (SELECT "name" FROM "accommodations_accommodationunit") TO STDOUT WITH (FORMAT csv, HEADER)'
+        )
+        fake_connection.close.assert_called_once()
+
+
+class IterWrittenTest(SimpleTestCase):
+    """
+    Tests for iter_written.
+    """
+    
+    def test_streams_output_larger_than_the_pipe(self):
+        def write(out):
+            for line in range(20000):
+                out.write(b'%d,row\r\n' % line)
+        chunks = list(iter_written(write, chunk_size=4096))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b''.join(chunks), b''.join(b'%d,row\r\n' % line for line in range(20000)))
+    
+    def test_writer_error_is_raised_after_its_output(self):
+        def write(out):
+            out.write(b'partial')
+            raise ValueError('query failed')
+        chunks = iter_written(write)
+        self.assertEqual(next(chunks), b'partial')
+        with self.assertRaisesMessage(ValueError, 'query failed'):
+            next(chunks)
+    
+    def test_closing_early_stops_the_writer(self):
+        finished = []
+        
+        def write(out):
+            try:
+                while True:
+                    out.write(b'x' * 4096)
+            finally:
+                finished.append(True)
+        chunks = iter_written(write, chunk_size=16)
+        next(chunks)
+        chunks.close()
+        self.assertEqual(finished, [True])
+
+
+@override_settings(QUERY_REPEAT_THRESHOLD=3)
+class QueryInspectorMiddlewareTest(TestCase):
+    """Test suite for QueryInspectorMiddleware."""
+    
+    def run_view(self, lookups):
+        def view(request):
+            for pk in range(lookups):
+                User.objects.filter(pk=pk).exists()
+            return HttpResponse()
+        return QueryInspectorMiddleware(view)(RequestFactory().get('/api/example/'))
+    
+    def test_logs_repeated_queries(self):
+        """Test that a per-row query loop is reported with its count."""
+        with self.assertLogs('core.middleware', 'WARNING') as logs:
+            self.run_view(3)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('GET /api/example/ ran the same query 3 times', logs.output[0])
+    
+    def test_quiet_below_threshold(self):
+        """Test that queries repeated fewer times than the threshold are not reported."""
+        with self.assertNoLogs('core.middleware', 'WARNING'):
+            self.run_view(2)
+
+
+class ReadCsvUploadTest(SimpleTestCase):
+    """
+    Tests for read_csv_upload.
+    """
+    
+    def test_rows_and_json_fields(self):
+        upload = SimpleUploadedFile('clients.csv', 'name,tags\r\nJoão,"[""vip""]"\r\nAna,oops\r\nBia,\r\n'.encode())
+        rows = read_csv_upload(upload, json_fields=['tags'])
+        self.assertIsInstance(rows, Iterator)
+        self.assertEqual(list(rows), [
+            {'name': 'João', 'tags': ['vip']},
+            {'name': 'Ana', 'tags': []},
+            {'name': 'Bia', 'tags': ''},
+        ])
+    
+    def test_irregular_rows_match_dict_reader(self):
+        content = 'name,phone,email\r\nAna,1\r\n\r\nBia,2,b@x.com,extra\r\n"Cris\nSilva",3,c@x.com\r\n'
+        rows = list(read_csv_upload(SimpleUploadedFile('clients.csv', content.encode())))
+        self.assertEqual(rows, list(csv.DictReader(io.StringIO(content, newline=''))))
+        self.assertEqual(list(read_csv_upload(SimpleUploadedFile('empty.csv', b''))), [])
+
+
+class ReadJsonUploadTest(SimpleTestCase):
+    """
+    Tests for read_json_upload.
+    """
+    
+    def read(self, content, chunk_size):
+        result = read_json_upload(SimpleUploadedFile('data.json', content.encode()), chunk_size=chunk_size)
+        return list(result) if isinstance(result, Iterator) else result
+    
+    def test_matches_json_loads_across_chunk_boundaries(self):
+        documents = [
+            '[]',
+            ' [ {"name": "Chalé", "tags": ["a,]b"], "price": 123456.78}, null, true, -0.5e3 ] ',
+            '{"clients": []}',
+        ]
+        for content in documents:
+            for chunk_size in (1, 2, 5, 64):
+                with self.subTest(content=content, chunk_size=chunk_size):
+                    self.assertEqual(self.read(content, chunk_size), json.loads(content))
+    
+    def test_malformed(self):
+        for content in ('[1,]', '[1 2]', '[{"a": 1', '[1] x', ''):
+            for chunk_size in (1, 64):
+                with self.subTest(content=content, chunk_size=chunk_size):
+                    with self.assertRaises(json.JSONDecodeError):
+                        self.read(content, chunk_size)
+
+
+class ExportAllDataTest(TestCase):
+    """
+    Tests for the combined export (export_all_data).
+    """
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_login(self.user)
+        self.unit = AccommodationUnit.objects.create(name='Chalé 1', max_capacity=4, base_price=Decimal('250.00'))
+        self.guest = Client.objects.create(full_name='João Silva', cpf='123.456.789-00', phone='11999999999', tags=['vip'])
+        check_in = datetime(2025, 3, 1, 17, 0, tzinfo=dt_timezone.utc)
+        Reservation.objects.create(
+            accommodation_unit=self.unit, client=self.guest,
+            check_in=check_in, check_out=datetime(2025, 3, 3, 15, 0, tzinfo=dt_timezone.utc),
+        )
+        Transaction.objects.create(
+            amount=Decimal('100.00'), due_date=date(2025, 3, 1),
+            transaction_type=Transaction.INCOME, payment_method=Transaction.PIX,
+        )
+    
+    def test_export_matches_serializer_values(self):
+        """Test that the exported values match what the API serializers return."""
+        response = self.client.get('/api/export-all/')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        
+        self.assertEqual(data['clients'][0]['tags'], ['vip'])
+        self.assertEqual(data['units'][0]['base_price'], '250.00')
+        self.assertEqual(data['units'][0]['default_check_in_time'], '14:00:00')
+        self.assertEqual(data['financials'][0]['amount'], '100.00')
+        self.assertIsNone(data['financials'][0]['paid_date'])
+        
+        reservation = data['reservations'][0]
+        self.assertEqual(reservation['client_cpf'], '123.456.789-00')
+        self.assertEqual(reservation['unit_name'], 'Chalé 1')
+        expected = self.client.get('/api/reservations/').json()['results'][0]
+        self.assertEqual(reservation['check_in'], expected['check_in'])
+    
+    def test_import_round_trips_export(self):
+        """Test that an export imports back into an empty database, skipping invalid rows."""
+        data = json.loads(self.client.get('/api/export-all/').content)
+        Reservation.objects.all().delete()
+        Transaction.objects.all().delete()
+        Client.objects.all().delete()
+        AccommodationUnit.objects.all().delete()
+        data['financials'].append({'amount': 'abc'})
+        
+        response = self.client.post('/api/import-all/', data, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        results = response.json()
+        self.assertEqual({key: value['imported'] for key, value in results.items()},
+                         {'clients': 1, 'units': 1, 'reservations': 1, 'financials': 1})
+        self.assertEqual([error['index'] for error in results['financials']['errors']], [1])
+        self.assertEqual(Reservation.objects.get().client.cpf, '123.456.789-00')
+    
+    def test_import_file_upload(self):
+        """Test that a backup file is imported, and one that isn't valid UTF-8 JSON is rejected."""
+        content = self.client.get('/api/export-all/').content
+        Reservation.objects.all().delete()
+        response = self.client.post('/api/import-all/', {'file': SimpleUploadedFile('all_data.json', content)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['reservations']['imported'], 1)
+        
+        for bad in (b'{"clients": [', '{"clients": []}'.encode('utf-16')):
+            response = self.client.post('/api/import-all/', {'file': SimpleUploadedFile('all_data.json', bad)})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json(), {'error': 'Invalid JSON file'})
+    
+    def test_import_reservations_for_existing_records(self):
+        """Test that a backup with only reservations resolves clients and units already in the database."""
+        reservation = json.loads(self.client.get('/api/export-all/').content)['reservations'][0]
+        Reservation.objects.all().delete()
+        
+        response = self.client.post('/api/import-all/', {'reservations': [reservation]}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['reservations'], {'imported': 1, 'errors': []})
+        self.assertEqual(Reservation.objects.get().client, self.guest)
+    
+    def test_import_numeric_cpf_and_name(self):
+        """Test that numeric CPFs and unit names update the existing records stored as text."""
+        guest = Client.objects.create(full_name='Ana Souza', cpf='12345678900')
+        unit = AccommodationUnit.objects.create(name='7', max_capacity=2, base_price=Decimal('100.00'))
+        data = {
+            'clients': [{'full_name': 'Ana Souza Lima', 'cpf': 12345678900}],
+            'units': [{'name': 7, 'max_capacity': 3}],
+            'reservations': [{
+                'client_cpf': 12345678900, 'unit_name': 7,
+                'check_in': '2025-04-01T17:00:00Z', 'check_out': '2025-04-03T15:00:00Z',
+            }],
+        }
+        response = self.client.post('/api/import-all/', data, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        results = response.json()
+        self.assertEqual({key: value['imported'] for key, value in results.items()},
+                         {'clients': 1, 'units': 1, 'reservations': 1, 'financials': 0})
+        guest.refresh_from_db()
+        unit.refresh_from_db()
+        self.assertEqual((guest.full_name, unit.max_capacity), ('Ana Souza Lima', 3))
+        self.assertEqual(Reservation.objects.get(accommodation_unit=unit).client, guest)
@@ -1,5 +1,6 @@
 from django.http import HttpResponse
 from django.contrib.auth import authenticate
+from django.db import transaction
 from django.views.decorators.http import require_GET
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
@@ -8,8 +9,8 @@ from rest_framework.decorators import parser_classes
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.permissions import AllowAny, IsAuthenticated
-import json
 import csv
+import orjson
 from io import StringIO
 
 from clients.models import Client
@@ -20,6 +21,12 @@ from reservations.models import Reservation
 from reservations.serializers import ReservationSerializer
 from financials.models import Transaction
 from financials.serializers import TransactionSerializer
+from accommodations.views import UNIT_EXPORT_FIELDS
+from clients.views import CLIENT_EXPORT_FIELDS
+from financials.views import TRANSACTION_EXPORT_FIELDS
+from reservations.views import reservation_export_rows
+from core.exports import dumps_json
+from core.imports import in_bulk_by, lookup_key
 
 
 @api_view(['GET'])
@@ -28,76 +35,11 @@ def export_all_data(request):
     Export all data (clients, units, reservations, financials) to JSON format.
     Query param: format (json only for combined export)
     """
-    # Get all clients
-    clients = Client.objects.all()
-    clients_serializer = ClientSerializer(clients, many=True)
-    clients_data = []
-    for client in clients_serializer.data:
-        clients_data.append({
-            'full_name': client.get('full_name', ''),
-            'cpf': client.get('cpf', ''),
-            'phone': client.get('phone', ''),
-            'email': client.get('email', ''),
-            'address': client.get('address', ''),
-            'notes': client.get('notes', ''),
-            'tags': client.get('tags', []),
-        })
-    
-    # Get all units
-    units = AccommodationUnit.objects.all()
-    units_serializer = AccommodationUnitSerializer(units, many=True)
-    units_data = []
-    for unit in units_serializer.data:
-        units_data.append({
-            'name': unit.get('name', ''),
-            'max_capacity': unit.get('max_capacity', 0),
-            'base_price': unit.get('base_price', '0.00'),
-            'weekend_price': unit.get('weekend_price', ''),
-            'holiday_price': unit.get('holiday_price', ''),
-            'color_hex': unit.get('color_hex', '#4A90E2'),
-            'status': unit.get('status', 'CLEAN'),
-            'auto_dirty_days': unit.get('auto_dirty_days', 3),
-            'default_check_in_time': unit.get('default_check_in_time', '14:00:00'),
-            'default_check_out_time': unit.get('default_check_out_time', '12:00:00'),
-        })
-    
-    # Get all reservations
-    reservations = Reservation.objects.all()
-    reservations_serializer = ReservationSerializer(reservations, many=True)
-    reservations_data = []
-    for res in reservations_serializer.data:
-        client_cpf = res.get('client', {}).get('cpf', '') if isinstance(res.get('client'), dict) else ''
-        unit_name = res.get('accommodation_unit', {}).get('name', '') if isinstance(res.get('accommodation_unit'), dict) else ''
-        reservations_data.append({
-            'client_cpf': client_cpf,
-            'unit_name': unit_name,
-            'check_in': res.get('check_in', ''),
-            'check_out': res.get('check_out', ''),
-            'guest_count_adults': res.get('guest_count_adults', 1),
-            'guest_count_children': res.get('guest_count_children', 0),
-            'total_price': res.get('total_price', ''),
-            'amount_paid': res.get('amount_paid', '0.00'),
-            'status': res.get('status', 'PENDING'),
-            'notes': res.get('notes', ''),
-            'price_breakdown': res.get('price_breakdown', []),
-            'payment_history': res.get('payment_history', []),
-        })
-    
-    # Get all transactions
-    transactions = Transaction.objects.all()
-    transactions_serializer = TransactionSerializer(transactions, many=True)
-    transactions_data = []
-    for trans in transactions_serializer.data:
-        transactions_data.append({
-            'amount': trans.get('amount', '0.00'),
-            'transaction_type': trans.get('transaction_type', 'INCOME'),
-            'category': trans.get('category', 'LODGING'),
-            'payment_method': trans.get('payment_method', 'PIX'),
-            'due_date': trans.get('due_date', ''),
-            'paid_date': trans.get('paid_date', ''),
-            'description': trans.get('description', ''),
-            'notes': trans.get('notes', ''),
-        })
+    # Plain column values for every section, without running the serializers
+    clients_data = list(Client.objects.values(*CLIENT_EXPORT_FIELDS))
+    units_data = list(AccommodationUnit.objects.values(*UNIT_EXPORT_FIELDS))
+    reservations_data = list(reservation_export_rows(Reservation.objects.all()))
+    transactions_data = list(Transaction.objects.values(*TRANSACTION_EXPORT_FIELDS))
     
     export_data = {
         'clients': clients_data,
@@ -107,7 +49,7 @@ def export_all_data(request):
     }
     
     response = HttpResponse(
-        json.dumps(export_data, ensure_ascii=False, indent=2),
+        dumps_json(export_data, indent=True),
         content_type='application/json'
     )
     response['Content-Disposition'] = 'attachment; filename="all_data.json"'
@@ -133,10 +75,11 @@ def import_all_data(request):
     file = request.FILES.get('file')
     
     if file:
-        file_content = file.read().decode('utf-8')
+        # The backup is one object, so it can't be decoded element by element like the
+        # per-model imports; orjson parses the UTF-8 bytes without an intermediate str
         try:
-            data = json.loads(file_content)
-        except json.JSONDecodeError:
+            data = orjson.loads(file.read())
+        except orjson.JSONDecodeError:
             return Response(
                 {'error': 'Invalid JSON file'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -150,141 +93,166 @@ def import_all_data(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Import clients first
-    for idx, client_data in enumerate(data.get('clients', [])):
-        try:
-            cpf = client_data.get('cpf', '')
-            existing = Client.objects.filter(cpf=cpf).first()
-            
-            if existing:
-                serializer = ClientSerializer(existing, data=client_data, partial=True)
-            else:
-                serializer = ClientSerializer(data=client_data)
-            
-            if serializer.is_valid():
-                serializer.save()
-                results['clients']['imported'] += 1
-            else:
+    # One transaction for the whole import instead of a commit per row
+    with transaction.atomic():
+        # Import clients first
+        clients = data.get('clients', [])
+        # One query per section for the existing records, instead of one per row
+        clients_by_cpf = in_bulk_by(Client, 'cpf', (row.get('cpf') for row in clients if isinstance(row, dict)))
+        for idx, client_data in enumerate(clients):
+            try:
+                existing = clients_by_cpf.get(lookup_key(client_data.get('cpf')))
+                
+                if existing:
+                    serializer = ClientSerializer(existing, data=client_data, partial=True)
+                else:
+                    serializer = ClientSerializer(data=client_data)
+                
+                if serializer.is_valid():
+                    # Savepoint per row, so a failed write doesn't abort the others
+                    with transaction.atomic():
+                        client = serializer.save()
+                    if client.cpf:
+                        clients_by_cpf[client.cpf] = client
+                    results['clients']['imported'] += 1
+                else:
+                    results['clients']['errors'].append({
+                        'index': idx,
+                        'data': client_data,
+                        'errors': serializer.errors
+                    })
+            except Exception as e:
                 results['clients']['errors'].append({
                     'index': idx,
                     'data': client_data,
-                    'errors': serializer.errors
+                    'errors': str(e)
                 })
-        except Exception as e:
-            results['clients']['errors'].append({
-                'index': idx,
-                'data': client_data,
-                'errors': str(e)
-            })
-    
-    # Import units
-    for idx, unit_data in enumerate(data.get('units', [])):
-        try:
-            name = unit_data.get('name', '')
-            existing = AccommodationUnit.objects.filter(name=name).first()
-            
-            if existing:
-                serializer = AccommodationUnitSerializer(existing, data=unit_data, partial=True)
-            else:
-                serializer = AccommodationUnitSerializer(data=unit_data)
-            
-            if serializer.is_valid():
-                serializer.save()
-                results['units']['imported'] += 1
-            else:
+        
+        # Import units
+        units = data.get('units', [])
+        units_by_name = in_bulk_by(AccommodationUnit, 'name', (row.get('name') for row in units if isinstance(row, dict)))
+        for idx, unit_data in enumerate(units):
+            try:
+                existing = units_by_name.get(lookup_key(unit_data.get('name')))
+                
+                if existing:
+                    serializer = AccommodationUnitSerializer(existing, data=unit_data, partial=True)
+                else:
+                    serializer = AccommodationUnitSerializer(data=unit_data)
+                
+                if serializer.is_valid():
+                    with transaction.atomic():
+                        unit = serializer.save()
+                    units_by_name[unit.name] = unit
+                    results['units']['imported'] += 1
+                else:
+                    results['units']['errors'].append({
+                        'index': idx,
+                        'data': unit_data,
+                        'errors': serializer.errors
+                    })
+            except Exception as e:
                 results['units']['errors'].append({
                     'index': idx,
                     'data': unit_data,
-                    'errors': serializer.errors
-                })
-        except Exception as e:
-            results['units']['errors'].append({
-                'index': idx,
-                'data': unit_data,
-                'errors': str(e)
-            })
-    
-    # Import reservations
-    for idx, res_data in enumerate(data.get('reservations', [])):
-        try:
-            client_cpf = res_data.get('client_cpf', '')
-            client = Client.objects.filter(cpf=client_cpf).first()
-            
-            if not client:
-                results['reservations']['errors'].append({
-                    'index': idx,
-                    'data': res_data,
-                    'errors': f"Client with CPF '{client_cpf}' not found"
-                })
-                continue
-            
-            unit_name = res_data.get('unit_name', '')
-            unit = AccommodationUnit.objects.filter(name=unit_name).first()
-            
-            if not unit:
-                results['reservations']['errors'].append({
-                    'index': idx,
-                    'data': res_data,
-                    'errors': f"Unit with name '{unit_name}' not found"
+                    'errors': str(e)
                 })
-                continue
-            
-            serializer_data = {
-                'client': client.id,
-                'accommodation_unit': unit.id,
-                'check_in': res_data.get('check_in'),
-                'check_out': res_data.get('check_out'),
-                'guest_count_adults': res_data.get('guest_count_adults', 1),
-                'guest_count_children': res_data.get('guest_count_children', 0),
-                'total_price': res_data.get('total_price') if res_data.get('total_price') != '' else None,
-                'amount_paid': res_data.get('amount_paid', '0.00'),
-                'status': res_data.get('status', 'PENDING'),
-                'notes': res_data.get('notes', ''),
-                'price_breakdown': res_data.get('price_breakdown', []),
-                'payment_history': res_data.get('payment_history', []),
-            }
-            
-            serializer = ReservationSerializer(data=serializer_data)
-            
-            if serializer.is_valid():
-                serializer.save()
-                results['reservations']['imported'] += 1
-            else:
+        
+        # Import reservations
+        reservations = data.get('reservations', [])
+        rows = [row for row in reservations if isinstance(row, dict)]
+        # Reservations may point at records outside this backup's clients/units
+        # sections, so resolve the rest with one query each
+        clients_by_cpf = {
+            **in_bulk_by(Client, 'cpf', (row.get('client_cpf') for row in rows)),
+            **clients_by_cpf,
+        }
+        units_by_name = {
+            **in_bulk_by(AccommodationUnit, 'name', (row.get('unit_name') for row in rows)),
+            **units_by_name,
+        }
+        for idx, res_data in enumerate(reservations):
+            try:
+                client_cpf = res_data.get('client_cpf', '')
+                client = clients_by_cpf.get(lookup_key(client_cpf))
+                
+                if not client:
+                    results['reservations']['errors'].append({
+                        'index': idx,
+                        'data': res_data,
+                        'errors': f"Client with CPF '{client_cpf}' not found"
+                    })
+                    continue
+                
+                unit_name = res_data.get('unit_name', '')
+                unit = units_by_name.get(lookup_key(unit_name))
+                
+                if not unit:
+                    results['reservations']['errors'].append({
+                        'index': idx,
+                        'data': res_data,
+                        'errors': f"Unit with name '{unit_name}' not found"
+                    })
+                    continue
+                
+                serializer_data = {
+                    'client': client.id,
+                    'accommodation_unit': unit.id,
+                    'check_in': res_data.get('check_in'),
+                    'check_out': res_data.get('check_out'),
+                    'guest_count_adults': res_data.get('guest_count_adults', 1),
+                    'guest_count_children': res_data.get('guest_count_children', 0),
+                    'total_price': res_data.get('total_price') if res_data.get('total_price') != '' else None,
+                    'amount_paid': res_data.get('amount_paid', '0.00'),
+                    'status': res_data.get('status', 'PENDING'),
+                    'notes': res_data.get('notes', ''),
+                    'price_breakdown': res_data.get('price_breakdown', []),
+                    'payment_history': res_data.get('payment_history', []),
+                }
+                
+                serializer = ReservationSerializer(data=serializer_data)
+                
+                if serializer.is_valid():
+                    with transaction.atomic():
+                        serializer.save()
+                    results['reservations']['imported'] += 1
+                else:
+                    results['reservations']['errors'].append({
+                        'index': idx,
+                        'data': res_data,
+                        'errors': serializer.errors
+                    })
+            except Exception as e:
                 results['reservations']['errors'].append({
                     'index': idx,
                     'data': res_data,
-                    'errors': serializer.errors
+                    'errors': str(e)
                 })
-        except Exception as e:
-            results['reservations']['errors'].append({
-                'index': idx,
-                'data': res_data,
-                'errors': str(e)
-            })
-    
-    # Import financials
-    for idx, trans_data in enumerate(data.get('financials', [])):
-        try:
-            if trans_data.get('paid_date') == '':
-                trans_data['paid_date'] = None
-            
-            serializer = TransactionSerializer(data=trans_data)
-            
-            if serializer.is_valid():
-                serializer.save()
-                results['financials']['imported'] += 1
-            else:
+        
+        # Import financials
+        for idx, trans_data in enumerate(data.get('financials', [])):
+            try:
+                if trans_data.get('paid_date') == '':
+                    trans_data['paid_date'] = None
+                
+                serializer = TransactionSerializer(data=trans_data)
+                
+                if serializer.is_valid():
+                    with transaction.atomic():
+                        serializer.save()
+                    results['financials']['imported'] += 1
+                else:
+                    results['financials']['errors'].append({
+                        'index': idx,
+                        'data': trans_data,
+                        'errors': serializer.errors
+                    })
+            except Exception as e:
                 results['financials']['errors'].append({
                     'index': idx,
                     'data': trans_data,
-                    'errors': serializer.errors
+                    'errors': str(e)
                 })
-        except Exception as e:
-            results['financials']['errors'].append({
-                'index': idx,
-                'data': trans_data,
-                'errors': str(e)
-            })
     
     total_imported = (
         results['clients']['imported'] +
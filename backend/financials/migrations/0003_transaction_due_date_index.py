@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-16 15:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financials', '0002_alter_transaction_options_alter_transaction_amount_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['due_date'], name='transaction_due_date'),
+        ),
+    ]
@@ -101,6 +101,10 @@ class Transaction(models.Model):
         verbose_name = "Transação"
         verbose_name_plural = "Transações"
         ordering = ['-due_date']
+        indexes = [
+            # Default ordering and the ?due_date_start/end filters
+            models.Index(fields=['due_date'], name='transaction_due_date'),
+        ]
     
     def __str__(self):
         status = "Pago" if self.is_paid else "Não Pago"
@@ -16,33 +16,30 @@ class TransactionAPITest(TestCase):
     Test suite for Transaction API endpoints.
     """
     
-    def setUp(self):
-        """Set up test client and sample data."""
-        self.client = APIClient()
-        
-        # Create a test user and authenticate
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Create the test user and sample data once for the whole class."""
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass123'
         )
-        self.token = Token.objects.create(user=self.user)
-        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        cls.token = Token.objects.create(user=cls.user)
         
         # Create accommodation and client for testing
-        self.unit = AccommodationUnit.objects.create(
+        cls.unit = AccommodationUnit.objects.create(
             name="Test Chalet",
             max_capacity=4,
             base_price=250.00,
             color_hex="#FF5733"
         )
-        self.guest = Client.objects.create(
+        cls.guest = Client.objects.create(
             full_name="João Silva",
             cpf="123.456.789-00",
             phone="+55 (11) 98765-4321"
         )
-        self.reservation = Reservation.objects.create(
-            accommodation_unit=self.unit,
-            client=self.guest,
+        cls.reservation = Reservation.objects.create(
+            accommodation_unit=cls.unit,
+            client=cls.guest,
             check_in=timezone.now(),
             check_out=timezone.now() + timedelta(days=3),
             guest_count_adults=2,
@@ -50,15 +47,15 @@ class TransactionAPITest(TestCase):
         )
         
         # Create test transactions
-        self.transaction1 = Transaction.objects.create(
-            reservation=self.reservation,
+        cls.transaction1 = Transaction.objects.create(
+            reservation=cls.reservation,
             amount=750.00,
             transaction_type=Transaction.INCOME,
             category=Transaction.LODGING,
             payment_method=Transaction.PIX,
             due_date=date.today()
         )
-        self.transaction2 = Transaction.objects.create(
+        cls.transaction2 = Transaction.objects.create(
             amount=200.00,
             transaction_type=Transaction.EXPENSE,
             category=Transaction.MAINTENANCE,
@@ -67,6 +64,11 @@ class TransactionAPITest(TestCase):
             paid_date=date.today()
         )
     
+    def setUp(self):
+        """Set up an authenticated test client."""
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+    
     def test_list_transactions(self):
         """Test listing all transactions."""
         response = self.client.get('/api/financials/')
@@ -87,6 +89,21 @@ class TransactionAPITest(TestCase):
         self.assertEqual(float(response.data['amount']), 100.00)
         self.assertEqual(Transaction.objects.count(), 3)
     
+    def test_import_keeps_valid_rows(self):
+        """Test that import saves the valid rows and reports the invalid ones."""
+        data = [
+            {'amount': '50.00', 'transaction_type': 'INCOME', 'category': 'LODGING',
+             'payment_method': 'PIX', 'due_date': date.today().isoformat(), 'paid_date': ''},
+            {'amount': 'abc', 'transaction_type': 'INCOME', 'due_date': date.today().isoformat()},
+            {'amount': '75.00', 'transaction_type': 'EXPENSE', 'category': 'SUPPLIES',
+             'payment_method': 'CASH', 'due_date': date.today().isoformat()},
+        ]
+        response = self.client.post('/api/financials/import_data/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imported'], 2)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1])
+        self.assertEqual(Transaction.objects.count(), 4)
+    
     def test_get_transaction(self):
         """Test retrieving a specific transaction."""
         response = self.client.get(f'/api/financials/{self.transaction1.id}/')
@@ -4,12 +4,18 @@ from rest_framework.response import Response
 from rest_framework.filters import OrderingFilter
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django_filters.rest_framework import DjangoFilterBackend
-from django.http import HttpResponse
+from django.db import transaction
 import json
-import csv
-from io import StringIO
+from collections.abc import Iterator
 from .models import Transaction
 from .serializers import TransactionSerializer
+from core.exports import EXPORT_CHUNK_SIZE, copy_csv, stream_json
+from core.imports import read_csv_upload, read_json_upload
+
+TRANSACTION_EXPORT_FIELDS = (
+    'amount', 'transaction_type', 'category', 'payment_method',
+    'due_date', 'paid_date', 'description', 'notes'
+)
 
 
 class TransactionViewSet(viewsets.ModelViewSet):
@@ -57,46 +63,13 @@ class TransactionViewSet(viewsets.ModelViewSet):
         Query param: export_format (json or csv, default: json)
         """
         export_format = request.query_params.get('export_format', 'json').lower()
-        transactions = self.get_queryset()
-        serializer = self.get_serializer(transactions, many=True)
-        data = serializer.data
-        
-        # Prepare export data
-        export_data = []
-        for trans in data:
-            export_item = {
-                'amount': trans.get('amount', '0.00'),
-                'transaction_type': trans.get('transaction_type', 'INCOME'),
-                'category': trans.get('category', 'LODGING'),
-                'payment_method': trans.get('payment_method', 'PIX'),
-                'due_date': trans.get('due_date', ''),
-                'paid_date': trans.get('paid_date', ''),
-                'description': trans.get('description', ''),
-                'notes': trans.get('notes', ''),
-            }
-            export_data.append(export_item)
         
         if export_format == 'csv':
-            response = HttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = 'attachment; filename="financials.csv"'
-            
-            if export_data:
-                writer = csv.DictWriter(response, fieldnames=[
-                    'amount', 'transaction_type', 'category', 'payment_method',
-                    'due_date', 'paid_date', 'description', 'notes'
-                ])
-                writer.writeheader()
-                for row in export_data:
-                    writer.writerow(row)
-            
-            return response
-        else:
-            response = HttpResponse(
-                json.dumps(export_data, ensure_ascii=False, indent=2),
-                content_type='application/json'
-            )
-            response['Content-Disposition'] = 'attachment; filename="financials.json"'
-            return response
+            return copy_csv(self.get_queryset(), TRANSACTION_EXPORT_FIELDS, 'financials.csv')
+        
+        # Plain column values, fetched in chunks and written as they arrive
+        rows = self.get_queryset().values(*TRANSACTION_EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        return stream_json(rows, 'financials.json')
     
     @action(detail=False, methods=['post'], parser_classes=[MultiPartParser, FormParser, JSONParser])
     def import_data(self, request):
@@ -111,17 +84,15 @@ class TransactionViewSet(viewsets.ModelViewSet):
         file = request.FILES.get('file')
         
         if file:
-            file_content = file.read().decode('utf-8')
             filename = file.name.lower()
             
             if filename.endswith('.csv'):
-                # Parse CSV
-                reader = csv.DictReader(StringIO(file_content))
-                data = list(reader)
+                # Rows are decoded and parsed lazily, as the import consumes them
+                data = read_csv_upload(file)
             else:
-                # Parse JSON
+                # JSON arrays are also decoded one element at a time
                 try:
-                    data = json.loads(file_content)
+                    data = read_json_upload(file)
                 except json.JSONDecodeError:
                     return Response(
                         {'error': 'Invalid JSON file'},
@@ -131,35 +102,47 @@ class TransactionViewSet(viewsets.ModelViewSet):
             # Check for JSON body
             data = request.data if isinstance(request.data, list) else request.data.get('data', [])
         
-        if not isinstance(data, list):
+        # A list from JSON, or the row iterator of a CSV upload
+        if not isinstance(data, (list, Iterator)):
             return Response(
                 {'error': 'Data must be a list of transactions'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        for idx, trans_data in enumerate(data):
-            try:
-                # Clean up empty paid_date
-                if trans_data.get('paid_date') == '':
-                    trans_data['paid_date'] = None
-                
-                serializer = TransactionSerializer(data=trans_data)
-                
-                if serializer.is_valid():
-                    serializer.save()
-                    imported_count += 1
-                else:
-                    errors.append({
-                        'index': idx,
-                        'data': trans_data,
-                        'errors': serializer.errors
-                    })
-            except Exception as e:
-                errors.append({
-                    'index': idx,
-                    'data': trans_data,
-                    'errors': str(e)
-                })
+        # One transaction for the whole import instead of a commit per row
+        try:
+            with transaction.atomic():
+                for idx, trans_data in enumerate(data):
+                    try:
+                        # Clean up empty paid_date
+                        if trans_data.get('paid_date') == '':
+                            trans_data['paid_date'] = None
+                        
+                        serializer = TransactionSerializer(data=trans_data)
+                        
+                        if serializer.is_valid():
+                            # Savepoint per row, so a failed write doesn't abort the others
+                            with transaction.atomic():
+                                serializer.save()
+                            imported_count += 1
+                        else:
+                            errors.append({
+                                'index': idx,
+                                'data': trans_data,
+                                'errors': serializer.errors
+                            })
+                    except Exception as e:
+                        errors.append({
+                            'index': idx,
+                            'data': trans_data,
+                            'errors': str(e)
+                        })
+        except json.JSONDecodeError:
+            # Malformed JSON found partway through the upload; nothing was saved
+            return Response(
+                {'error': 'Invalid JSON file'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         return Response({
             'imported': imported_count,
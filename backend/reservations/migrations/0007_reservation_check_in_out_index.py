@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-16 15:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0006_reservation_pet_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['check_in', 'check_out'], name='reservation_check_in_out'),
+        ),
+    ]
@@ -104,6 +104,10 @@ class Reservation(models.Model):
         verbose_name = "Reserva"
         verbose_name_plural = "Reservas"
         ordering = ['-check_in']
+        indexes = [
+            # Default ordering, ?check_in_start/end filters and the availability overlap check
+            models.Index(fields=['check_in', 'check_out'], name='reservation_check_in_out'),
+        ]
     
     def __str__(self):
         return f"{self.accommodation_unit.name} - {self.client.full_name} ({self.check_in.strftime('%d/%m/%Y')} to {self.check_out.strftime('%d/%m/%Y')})"
@@ -57,6 +57,14 @@ class ReservationSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'accommodation_unit_details', 'client_details', 'amount_remaining', 'is_fully_paid', 'created_at', 'updated_at']
     
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Load the nested client and unit (with their documents and images) in bulk."""
+        return queryset.select_related('client', 'accommodation_unit').prefetch_related(
+            'client__document_attachments',
+            AccommodationUnitSerializer.images_prefetch('accommodation_unit__'),
+        )
+    
     def to_representation(self, instance):
         """
         Personaliza a representação de saída para incluir objetos aninhados.
@@ -1,8 +1,13 @@
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from datetime import timedelta
+from io import StringIO
+import csv
+import json
 from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework.authtoken.models import Token
@@ -16,26 +21,23 @@ class ReservationAPITest(TestCase):
     Test suite for Reservation API endpoints.
     """
     
-    def setUp(self):
-        """Set up test client and sample data."""
-        self.client = APIClient()
-        
-        # Create a test user and authenticate
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Create the test user and sample data once for the whole class."""
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass123'
         )
-        self.token = Token.objects.create(user=self.user)
-        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        cls.token = Token.objects.create(user=cls.user)
         
         # Create accommodation units
-        self.unit1 = AccommodationUnit.objects.create(
+        cls.unit1 = AccommodationUnit.objects.create(
             name="Test Chalet 1",
             max_capacity=4,
             base_price=250.00,
             color_hex="#FF5733"
         )
-        self.unit2 = AccommodationUnit.objects.create(
+        cls.unit2 = AccommodationUnit.objects.create(
             name="Test Suite 2",
             max_capacity=2,
             base_price=150.00,
@@ -43,35 +45,117 @@ class ReservationAPITest(TestCase):
         )
         
         # Create clients
-        self.guest1 = Client.objects.create(
+        cls.guest1 = Client.objects.create(
             full_name="João Silva",
             cpf="123.456.789-00",
             phone="+55 (11) 98765-4321"
         )
-        self.guest2 = Client.objects.create(
+        cls.guest2 = Client.objects.create(
             full_name="Maria Santos",
             cpf="987.654.321-00",
             phone="+55 (21) 91234-5678"
         )
         
         # Create base reservation
-        self.base_date = timezone.now().replace(hour=14, minute=0, second=0, microsecond=0)
-        self.reservation1 = Reservation.objects.create(
-            accommodation_unit=self.unit1,
-            client=self.guest1,
-            check_in=self.base_date,
-            check_out=self.base_date + timedelta(days=3),
+        cls.base_date = timezone.now().replace(hour=14, minute=0, second=0, microsecond=0)
+        cls.reservation1 = Reservation.objects.create(
+            accommodation_unit=cls.unit1,
+            client=cls.guest1,
+            check_in=cls.base_date,
+            check_out=cls.base_date + timedelta(days=3),
             guest_count_adults=2,
             guest_count_children=1,
             status=Reservation.CONFIRMED
         )
     
+    def setUp(self):
+        """Set up an authenticated test client."""
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+    
     def test_list_reservations(self):
         """Test listing all reservations."""
         response = self.client.get('/api/reservations/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
     
+    def test_export_csv_matches_json_export(self):
+        """Test that the streamed CSV export carries the same values as the JSON export."""
+        response = self.client.get('/api/reservations/export_data/', {'export_format': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="reservations.csv"')
+        rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+        
+        response = self.client.get('/api/reservations/export_data/')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        expected = json.loads(b''.join(response.streaming_content))
+        detail = self.client.get(f'/api/reservations/{self.reservation1.pk}/').data
+        self.assertEqual(expected[0]['check_in'], detail['check_in'])
+        self.assertEqual(len(rows), 1)
+        for field in ('client_cpf', 'unit_name', 'check_in', 'check_out', 'amount_paid', 'status'):
+            self.assertEqual(rows[0][field], str(expected[0][field]))
+        self.assertEqual(json.loads(rows[0]['price_breakdown']), expected[0]['price_breakdown'])
+    
+    def test_import_resolves_clients_and_units_per_batch(self):
+        """Test that import looks up the referenced clients and units once, not per row."""
+        data = [
+            {
+                'client_cpf': guest.cpf,
+                'unit_name': self.unit2.name,
+                'check_in': (self.base_date + timedelta(days=10 * offset)).isoformat(),
+                'check_out': (self.base_date + timedelta(days=10 * offset + 2)).isoformat(),
+            }
+            for offset, guest in enumerate((self.guest1, self.guest2, self.guest1), start=1)
+        ]
+        data.append({**data[0], 'client_cpf': '000.000.000-00'})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/reservations/import_data/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imported'], 3)
+        self.assertEqual([error['index'] for error in response.data['errors']], [3])
+        self.assertEqual(Reservation.objects.filter(accommodation_unit=self.unit2).count(), 3)
+        cpf_lookups = [q for q in queries if '"clients_client"."cpf" IN' in q['sql']]
+        self.assertEqual(len(cpf_lookups), 1)
+    
+    def test_import_numeric_cpf_and_name(self):
+        """Test that numeric CPFs and unit names match the existing records stored as text."""
+        guest = Client.objects.create(full_name="Ana Souza", cpf="12345678900")
+        unit = AccommodationUnit.objects.create(name="7", max_capacity=2, base_price=100.00)
+        data = [{
+            'client_cpf': 12345678900,
+            'unit_name': 7,
+            'check_in': (self.base_date + timedelta(days=30)).isoformat(),
+            'check_out': (self.base_date + timedelta(days=32)).isoformat(),
+        }]
+        response = self.client.post('/api/reservations/import_data/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imported'], 1)
+        reservation = Reservation.objects.get(accommodation_unit=unit)
+        self.assertEqual(reservation.client, guest)
+    
+    def test_list_query_count_does_not_grow_with_reservations(self):
+        """Test that nested clients and units are loaded in bulk, not per reservation."""
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get('/api/reservations/')
+        
+        for idx in range(3):
+            guest = Client.objects.create(full_name=f"Hóspede {idx}", phone=f"+55 (11) 90000-000{idx}")
+            Reservation.objects.create(
+                accommodation_unit=self.unit2,
+                client=guest,
+                check_in=self.base_date + timedelta(days=10 + idx * 3),
+                check_out=self.base_date + timedelta(days=12 + idx * 3),
+                guest_count_adults=1,
+                status=Reservation.CONFIRMED
+            )
+        
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/reservations/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual(len(context), len(baseline))
+    
     def test_create_reservation(self):
         """Test creating a new reservation with write-only IDs."""
         data = {
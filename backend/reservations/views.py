@@ -1,22 +1,26 @@
-from rest_framework import viewsets, status
+from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.filters import OrderingFilter
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import F, Q
 from django.http import HttpResponse
 from django.utils import timezone
 import json
-import csv
 import re
-from io import StringIO, BytesIO
+from collections.abc import Iterator
+from io import BytesIO
 from urllib.parse import quote
 from datetime import datetime
 from .models import Reservation
 from .serializers import ReservationSerializer
 from accommodations.models import AccommodationUnit
 from clients.models import Client
+from core.exports import EXPORT_CHUNK_SIZE, stream_csv, stream_json
+from core.imports import batched, in_bulk_by, lookup_key, read_csv_upload, read_json_upload
+from core.mixins import EagerLoadingMixin
 
 # ReportLab imports for PDF generation
 from reportlab.lib import colors
@@ -37,8 +41,37 @@ import base64
 # HTML escape utility for ReportLab
 from html import escape as html_escape
 
+RESERVATION_EXPORT_FIELDS = (
+    'client_cpf', 'unit_name', 'check_in', 'check_out',
+    'guest_count_adults', 'guest_count_children', 'total_price',
+    'amount_paid', 'status', 'notes', 'price_breakdown', 'payment_history'
+)
+
+# Inline markdown of the receipt text, compiled once for all lines.
+# Bold: **text** or __text__; italic: *text* or _text_ (lookarounds skip bold markers)
+MARKDOWN_BOLD_RE = (re.compile(r'\*\*(.+?)\*\*'), re.compile(r'__(.+?)__'))
+MARKDOWN_ITALIC_RE = (re.compile(r'(?<!\*)\*([^*]+)\*(?!\*)'), re.compile(r'(?<!_)_([^_]+)_(?!_)'))
+
+
+def reservation_export_rows(queryset):
+    """
+    Yield export rows straight from column values, fetched in chunks,
+    formatting check-in/out the same way the serializer does.
+    """
+    datetime_field = serializers.DateTimeField()
+    # values() reads client/unit through the join, so drop any prefetches
+    rows = queryset.prefetch_related(None).values(
+        'check_in', 'check_out', 'guest_count_adults', 'guest_count_children',
+        'total_price', 'amount_paid', 'status', 'notes', 'price_breakdown', 'payment_history',
+        client_cpf=F('client__cpf'), unit_name=F('accommodation_unit__name'),
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for row in rows:
+        row['check_in'] = datetime_field.to_representation(row['check_in'])
+        row['check_out'] = datetime_field.to_representation(row['check_out'])
+        yield row
 
-class ReservationViewSet(viewsets.ModelViewSet):
+
+class ReservationViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing Reservation resources.
     
@@ -159,7 +192,9 @@ class ReservationViewSet(viewsets.ModelViewSet):
         )
         
         from accommodations.serializers import AccommodationUnitSerializer
-        serializer = AccommodationUnitSerializer(available_units, many=True)
+        serializer = AccommodationUnitSerializer(
+            AccommodationUnitSerializer.setup_eager_loading(available_units), many=True
+        )
         
         return Response({
             'check_in': check_in_str,
@@ -174,56 +209,12 @@ class ReservationViewSet(viewsets.ModelViewSet):
         Query param: export_format (json or csv, default: json)
         """
         export_format = request.query_params.get('export_format', 'json').lower()
-        reservations = self.get_queryset()
-        serializer = self.get_serializer(reservations, many=True)
-        data = serializer.data
-        
-        # Prepare export data with references by CPF and unit name
-        export_data = []
-        for res in data:
-            client_cpf = res.get('client', {}).get('cpf', '') if isinstance(res.get('client'), dict) else ''
-            unit_name = res.get('accommodation_unit', {}).get('name', '') if isinstance(res.get('accommodation_unit'), dict) else ''
-            
-            export_item = {
-                'client_cpf': client_cpf,
-                'unit_name': unit_name,
-                'check_in': res.get('check_in', ''),
-                'check_out': res.get('check_out', ''),
-                'guest_count_adults': res.get('guest_count_adults', 1),
-                'guest_count_children': res.get('guest_count_children', 0),
-                'total_price': res.get('total_price', ''),
-                'amount_paid': res.get('amount_paid', '0.00'),
-                'status': res.get('status', 'PENDING'),
-                'notes': res.get('notes', ''),
-                'price_breakdown': res.get('price_breakdown', []),
-                'payment_history': res.get('payment_history', []),
-            }
-            export_data.append(export_item)
+        rows = reservation_export_rows(self.get_queryset())
         
         if export_format == 'csv':
-            response = HttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = 'attachment; filename="reservations.csv"'
-            
-            if export_data:
-                writer = csv.DictWriter(response, fieldnames=[
-                    'client_cpf', 'unit_name', 'check_in', 'check_out',
-                    'guest_count_adults', 'guest_count_children', 'total_price',
-                    'amount_paid', 'status', 'notes', 'price_breakdown', 'payment_history'
-                ])
-                writer.writeheader()
-                for row in export_data:
-                    row['price_breakdown'] = json.dumps(row['price_breakdown']) if row['price_breakdown'] else '[]'
-                    row['payment_history'] = json.dumps(row['payment_history']) if row['payment_history'] else '[]'
-                    writer.writerow(row)
-            
-            return response
-        else:
-            response = HttpResponse(
-                json.dumps(export_data, ensure_ascii=False, indent=2),
-                content_type='application/json'
-            )
-            response['Content-Disposition'] = 'attachment; filename="reservations.json"'
-            return response
+            return stream_csv(rows, RESERVATION_EXPORT_FIELDS, 'reservations.csv',
+                              json_fields=['price_breakdown', 'payment_history'])
+        return stream_json(rows, 'reservations.json')
     
     @action(detail=False, methods=['post'], parser_classes=[MultiPartParser, FormParser, JSONParser])
     def import_data(self, request):
@@ -239,29 +230,15 @@ class ReservationViewSet(viewsets.ModelViewSet):
         file = request.FILES.get('file')
         
         if file:
-            file_content = file.read().decode('utf-8')
             filename = file.name.lower()
             
             if filename.endswith('.csv'):
-                # Parse CSV
-                reader = csv.DictReader(StringIO(file_content))
-                data = []
-                for row in reader:
-                    if 'price_breakdown' in row and row['price_breakdown']:
-                        try:
-                            row['price_breakdown'] = json.loads(row['price_breakdown'])
-                        except json.JSONDecodeError:
-                            row['price_breakdown'] = []
-                    if 'payment_history' in row and row['payment_history']:
-                        try:
-                            row['payment_history'] = json.loads(row['payment_history'])
-                        except json.JSONDecodeError:
-                            row['payment_history'] = []
-                    data.append(row)
+                # Rows are decoded and parsed lazily, as the import consumes them
+                data = read_csv_upload(file, json_fields=['price_breakdown', 'payment_history'])
             else:
-                # Parse JSON
+                # JSON arrays are also decoded one element at a time
                 try:
-                    data = json.loads(file_content)
+                    data = read_json_upload(file)
                 except json.JSONDecodeError:
                     return Response(
                         {'error': 'Invalid JSON file'},
@@ -271,71 +248,89 @@ class ReservationViewSet(viewsets.ModelViewSet):
             # Check for JSON body
             data = request.data if isinstance(request.data, list) else request.data.get('data', [])
         
-        if not isinstance(data, list):
+        # A list from JSON, or the row iterator of a CSV upload
+        if not isinstance(data, (list, Iterator)):
             return Response(
                 {'error': 'Data must be a list of reservations'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        for idx, res_data in enumerate(data):
-            try:
-                # Look up client by CPF
-                client_cpf = res_data.get('client_cpf', '')
-                client = Client.objects.filter(cpf=client_cpf).first()
-                
-                if not client:
-                    errors.append({
-                        'index': idx,
-                        'data': res_data,
-                        'errors': f"Client with CPF '{client_cpf}' not found"
-                    })
-                    continue
-                
-                # Look up unit by name
-                unit_name = res_data.get('unit_name', '')
-                unit = AccommodationUnit.objects.filter(name=unit_name).first()
-                
-                if not unit:
-                    errors.append({
-                        'index': idx,
-                        'data': res_data,
-                        'errors': f"Unit with name '{unit_name}' not found"
-                    })
-                    continue
-                
-                # Prepare data for serializer
-                serializer_data = {
-                    'client': client.id,
-                    'accommodation_unit': unit.id,
-                    'check_in': res_data.get('check_in'),
-                    'check_out': res_data.get('check_out'),
-                    'guest_count_adults': res_data.get('guest_count_adults', 1),
-                    'guest_count_children': res_data.get('guest_count_children', 0),
-                    'total_price': res_data.get('total_price') if res_data.get('total_price') != '' else None,
-                    'amount_paid': res_data.get('amount_paid', '0.00'),
-                    'status': res_data.get('status', 'PENDING'),
-                    'notes': res_data.get('notes', ''),
-                    'price_breakdown': res_data.get('price_breakdown', []),
-                    'payment_history': res_data.get('payment_history', []),
-                }
-                
-                serializer = ReservationSerializer(data=serializer_data)
-                
-                if serializer.is_valid():
-                    serializer.save()
-                    imported_count += 1
-                else:
-                    errors.append({
-                        'index': idx,
-                        'data': res_data,
-                        'errors': serializer.errors
-                    })
-            except Exception as e:
-                errors.append({
-                    'index': idx,
-                    'data': res_data,
-                    'errors': str(e)
-                })
+        # One transaction for the whole import instead of a commit per row
+        try:
+            with transaction.atomic():
+                for batch in batched(data):
+                    # Two queries resolve the clients and units referenced by the whole batch
+                    rows = [row for _, row in batch if isinstance(row, dict)]
+                    clients_by_cpf = in_bulk_by(Client, 'cpf', (row.get('client_cpf') for row in rows))
+                    units_by_name = in_bulk_by(AccommodationUnit, 'name', (row.get('unit_name') for row in rows))
+                    
+                    for idx, res_data in batch:
+                        try:
+                            # Look up client by CPF
+                            client_cpf = res_data.get('client_cpf', '')
+                            client = clients_by_cpf.get(lookup_key(client_cpf))
+                            
+                            if not client:
+                                errors.append({
+                                    'index': idx,
+                                    'data': res_data,
+                                    'errors': f"Client with CPF '{client_cpf}' not found"
+                                })
+                                continue
+                            
+                            # Look up unit by name
+                            unit_name = res_data.get('unit_name', '')
+                            unit = units_by_name.get(lookup_key(unit_name))
+                            
+                            if not unit:
+                                errors.append({
+                                    'index': idx,
+                                    'data': res_data,
+                                    'errors': f"Unit with name '{unit_name}' not found"
+                                })
+                                continue
+                            
+                            # Prepare data for serializer
+                            serializer_data = {
+                                'client': client.id,
+                                'accommodation_unit': unit.id,
+                                'check_in': res_data.get('check_in'),
+                                'check_out': res_data.get('check_out'),
+                                'guest_count_adults': res_data.get('guest_count_adults', 1),
+                                'guest_count_children': res_data.get('guest_count_children', 0),
+                                'total_price': res_data.get('total_price') if res_data.get('total_price') != '' else None,
+                                'amount_paid': res_data.get('amount_paid', '0.00'),
+                                'status': res_data.get('status', 'PENDING'),
+                                'notes': res_data.get('notes', ''),
+                                'price_breakdown': res_data.get('price_breakdown', []),
+                                'payment_history': res_data.get('payment_history', []),
+                            }
+                            
+                            serializer = ReservationSerializer(data=serializer_data)
+                            
+                            if serializer.is_valid():
+                                # Savepoint per row, so a failed write doesn't abort the others
+                                with transaction.atomic():
+                                    serializer.save()
+                                imported_count += 1
+                            else:
+                                errors.append({
+                                    'index': idx,
+                                    'data': res_data,
+                                    'errors': serializer.errors
+                                })
+                        except Exception as e:
+                            errors.append({
+                                'index': idx,
+                                'data': res_data,
+                                'errors': str(e)
+                            })
+        except json.JSONDecodeError:
+            # Malformed JSON found partway through the upload; nothing was saved
+            return Response(
+                {'error': 'Invalid JSON file'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         return Response({
             'imported': imported_count,
@@ -831,12 +826,11 @@ class ReservationViewSet(viewsets.ModelViewSet):
             else:
                 # Regular text - process inline formatting
                 processed_line = stripped
-                # Bold: **text** or __text__ (process before italic to avoid conflicts)
-                processed_line = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', processed_line)
-                processed_line = re.sub(r'__(.+?)__', r'<b>\1</b>', processed_line)
-                # Italic: *text* or _text_ (use negative lookbehind/lookahead to avoid matching bold markers)
-                processed_line = re.sub(r'(?<!\*)\*([^*]+)\*(?!\*)', r'<i>\1</i>', processed_line)
-                processed_line = re.sub(r'(?<!_)_([^_]+)_(?!_)', r'<i>\1</i>', processed_line)
+                # Bold first, so italic doesn't match half of a bold marker
+                for pattern in MARKDOWN_BOLD_RE:
+                    processed_line = pattern.sub(r'<b>\1</b>', processed_line)
+                for pattern in MARKDOWN_ITALIC_RE:
+                    processed_line = pattern.sub(r'<i>\1</i>', processed_line)
                 
                 current_paragraph.append(processed_line)
         
@@ -199,7 +199,7 @@ export function ReservationModal({
   useEffect(() => {
     const fetchClients = async () => {
       try {
-        const response = await api.get('clients/');
+        const response = await api.get('clients/', { params: { summary: true } });
         const clientsData = response.data.results || response.data;
         setClients(clientsData);
       } catch (err) {
@@ -114,17 +114,14 @@ export function Calendar() {
       // Fetch custom prices from backend
       const endDate = format(addYears(new Date(), 2), 'yyyy-MM-dd');
       const startDateStr = format(startDate, 'yyyy-MM-dd');
-      const pricesRes = await datePriceOverrides.list({ 
+      // Backend returns the map format { 'unitId-date': price } directly
+      const pricesRes = await datePriceOverrides.priceMap({ 
         start_date: startDateStr, 
         end_date: endDate 
       });
-      const pricesData = pricesRes.data.results || pricesRes.data;
-      
-      // Convert to map format { 'unitId-date': price }
       const pricesMap = {};
-      pricesData.forEach(priceOverride => {
-        const key = `${priceOverride.accommodation_unit}-${priceOverride.date}`;
-        pricesMap[key] = parseFloat(priceOverride.price);
+      Object.entries(pricesRes.data).forEach(([key, price]) => {
+        pricesMap[key] = parseFloat(price);
       });
       setCustomPrices(pricesMap);
 
@@ -34,7 +34,7 @@ export function Dashboard() {
       setLoading(true);
       
       // Fetch accommodations
-      const accommodationsRes = await api.get('accommodations/');
+      const accommodationsRes = await api.get('accommodations/', { params: { summary: true } });
       const accommodations = accommodationsRes.data.results || accommodationsRes.data;
       const cleanUnits = accommodations.filter(unit => unit.status === 'CLEAN').length;
       
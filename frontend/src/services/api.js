@@ -73,6 +73,7 @@ api.interceptors.response.use(
 // Date price overrides API
 export const datePriceOverrides = {
   list: (params) => api.get('/date-price-overrides/', { params }),
+  priceMap: (params) => api.get('/date-price-overrides/price_map/', { params }),
   create: (data) => api.post('/date-price-overrides/', data),
   bulkCreate: (data) => api.post('/date-price-overrides/bulk_create/', data),
   bulkDelete: (data) => api.post('/date-price-overrides/bulk_delete/', data),